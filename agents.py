@@ -0,0 +1,222 @@
+import asyncio
+import json
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+# =============================================================
+# Agentic AI CEO — concurrent agent runner
+# -------------------------------------------------------------
+# Every leadership agent runs as its own asyncio task behind a
+# semaphore, with a per-attempt timeout and retries. Cards are
+# yielded as soon as each agent finishes, so wall-clock time is
+# the slowest agent rather than the sum of all ten.
+#
+# Backends are pluggable: anything with
+#     async def run(self, leader: str, context: Dict) -> Dict
+# works. RuleBackend (default) builds cards from the rule engine;
+# HTTPBackend asks an LLM-style endpoint to enrich the "Failure
+# Mode"/"Effects" text, retrying failed calls; if the endpoint
+# still fails, the card keeps the rule-based text (and says why in
+# "enrichment_error"). serve_stub() is a local stand-in endpoint for
+# trying the HTTP path without a model.
+# =============================================================
+
+DEFAULT_FAILURE_MODE = "Execution gaps, misalignment, and unintended consequences while applying the decision through the lens of this leadership style."
+DEFAULT_EFFECTS = "Delays, cost overruns, quality issues, compliance risks, or missed market opportunities."
+HTTP_THREADS = 16  # blocking endpoint calls in flight, across all runs
+
+
+def agent_context(problem: str, decision: str, result: Dict) -> Dict:
+    """Shared input for every agent: the case text and its engine result (see engine.case_result)."""
+    return {"problem": problem, "decision": decision, "result": result}
+
+
+def rule_card(leader: str, result: Dict) -> Dict:
+    """A leader's card straight from an engine result (no backend, synchronous)."""
+    row = next(r for r in result["fmea"] if r["Leader"] == leader)
+    return {
+        **row,
+        "FailureMode": DEFAULT_FAILURE_MODE,
+        "Effects": DEFAULT_EFFECTS,
+        "actions": [a for a in result["actions"] if a["Leader"] == leader],
+    }
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+
+class RuleBackend:
+    """Cards straight from the rule engine; ``delay`` simulates thinking time per agent."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    async def run(self, leader: str, context: Dict) -> Dict:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return rule_card(leader, context["result"])
+
+
+_http_pool: Optional[ThreadPoolExecutor] = None
+_http_pool_lock = threading.Lock()
+
+
+def _http_executor() -> ThreadPoolExecutor:
+    """Shared, bounded pool for endpoint calls: a call that outlives its timeout
+    still holds a thread, so calls queue here instead of piling up threads."""
+    global _http_pool
+    with _http_pool_lock:
+        if _http_pool is None:
+            _http_pool = ThreadPoolExecutor(max_workers=HTTP_THREADS, thread_name_prefix="agent-http")
+        return _http_pool
+
+
+class HTTPBackend:
+    """Rule-engine card, with Failure Mode / Effects text enriched by a JSON-over-HTTP endpoint.
+
+    The endpoint receives {"leader", "problem", "decision", "scores", "themes"}
+    and may answer with "failure_mode" and/or "effects"; missing keys keep
+    the rule-based text. Failed calls are retried (`retries` times, with
+    backoff); if every attempt fails the card keeps the rule-engine scores,
+    mitigations and text, plus an "enrichment_error".
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0, base: Optional[RuleBackend] = None, retries: int = 2):
+        self.url = url
+        self.timeout = timeout
+        self.base = base or RuleBackend()
+        self.retries = retries
+
+    def _post(self, body: Dict) -> Dict:
+        req = urllib.request.Request(
+            self.url,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read() or b"{}")
+
+    async def run(self, leader: str, context: Dict) -> Dict:
+        card = await self.base.run(leader, context)
+        ranked = sorted(context["result"]["theme_scores"].items(), key=lambda x: x[1], reverse=True)
+        body = {
+            "leader": leader,
+            "problem": context["problem"],
+            "decision": context["decision"],
+            "scores": {k: card[k] for k in ("Severity", "Occurrence", "Detection", "RPN")},
+            "themes": [t for t, _ in ranked[:3]],
+        }
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            try:
+                reply = await asyncio.wait_for(loop.run_in_executor(_http_executor(), self._post, body), self.timeout)
+                if not isinstance(reply, dict):
+                    raise ValueError("reply is not a JSON object")
+                break
+            except Exception as exc:  # enrichment is optional: keep the rule-engine card
+                error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+            if attempt < self.retries:
+                await asyncio.sleep(0.1 * 2 ** attempt)
+        else:
+            card["enrichment_error"] = f"{error} (attempts: {self.retries + 1})"
+            return card
+        card["FailureMode"] = reply.get("failure_mode") or card["FailureMode"]
+        card["Effects"] = reply.get("effects") or card["Effects"]
+        return card
+
+
+# -----------------------------
+# Runner
+# -----------------------------
+
+async def _run_one(backend, leader: str, context: Dict, sem: asyncio.Semaphore, timeout: Optional[float], retries: int) -> Dict:
+    error = ""
+    for attempt in range(retries + 1):
+        async with sem:
+            try:
+                return await asyncio.wait_for(backend.run(leader, context), timeout)
+            except asyncio.TimeoutError:
+                error = f"timed out after {timeout}s"
+            except Exception as exc:  # backend failures are reported on the card, never raised
+                error = f"{type(exc).__name__}: {exc}"
+        if attempt < retries:
+            await asyncio.sleep(0.1 * 2 ** attempt)
+    return {"Leader": leader, "error": f"{error} (attempts: {retries + 1})"}
+
+
+async def run_agents(
+    backend,
+    leaders: Iterable[str],
+    context: Dict,
+    concurrency: int = 10,
+    timeout: Optional[float] = 30.0,
+    retries: int = 2,
+) -> AsyncIterator[Dict]:
+    """Run all agents concurrently and yield each card as it completes (completion order)."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    tasks = [asyncio.ensure_future(_run_one(backend, leader, context, sem, timeout, retries)) for leader in leaders]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+def run_agents_sync(backend, leaders: Iterable[str], context: Dict, **kwargs) -> List[Dict]:
+    """Blocking helper: all cards, in completion order."""
+    async def collect():
+        return [card async for card in run_agents(backend, leaders, context, **kwargs)]
+    return asyncio.run(collect())
+
+
+# -----------------------------
+# Local stub endpoint
+# -----------------------------
+
+async def serve_stub(host: str = "127.0.0.1", port: int = 8765, delay: float = 0.0) -> asyncio.AbstractServer:
+    """Start a tiny HTTP endpoint that answers HTTPBackend requests with canned text.
+
+    ``port=0`` picks a free port (see ``server.sockets[0].getsockname()``).
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.decode("latin-1").split("\r\n"):
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":", 1)[1])
+            req = json.loads(await reader.readexactly(length) or b"{}")
+            if delay:
+                await asyncio.sleep(delay)
+            themes = ", ".join(req.get("themes", [])) or "general execution"
+            leader = req.get("leader", "This leader").replace(" Agentic AI Agent CEO", "")
+            body = json.dumps({
+                "failure_mode": f"[stub] {leader}: risk concentrates in {themes}.",
+                "effects": f"[stub] RPN {req.get('scores', {}).get('RPN', '?')} drives the timeline.",
+            }).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ValueError):
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+if __name__ == "__main__":
+    async def _main() -> None:
+        server = await serve_stub()
+        print(f"Stub agent endpoint on http://{'%s:%s' % server.sockets[0].getsockname()[:2]}/")
+        async with server:
+            await server.serve_forever()
+    asyncio.run(_main())
@@ -1,9 +1,20 @@
 import streamlit as st
-import time
-import pandas as pd
-import numpy as np
-import altair as alt
-from typing import Dict, List, Tuple
+import asyncio
+import os
+import re
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from agents import HTTPBackend, RuleBackend, agent_context, rule_card, run_agents
+from archive import default_archive, quarter_start
+from cache import cached_case_result, cached_document_result
+from catalog import current, last_error, reload_if_changed
+from engine import CASES, results_payload
+from exports import ROADMAP_FORMATS, fmea_csv, fmea_rows, results_json, roadmap_bytes, roadmap_formats
+from ingest import CSV_EXTENSIONS, TEXT_EXTENSIONS, document_label
+from live import LiveCase
+from profiling import METRICS_FILE, finish_run, record_size, stage, start_run
+from sensitivity import case_inputs, document_inputs, simulate
 
 # =============================================================
 # Agentic AI CEO — 10 Leadership Agents FMEA (Context-Aware)
@@ -17,270 +28,51 @@ from typing import Dict, List, Tuple
 # - We also build a COMBINED ROADMAP weighted by RPN across
 #   all 10 agents.
 # - Still rule-based and Streamlit Free friendly (no extra deps).
+# - Rule tables live in rules/*.json (catalog.py) and are
+#   hot-reloaded when edited; scoring lives in engine.py; batch.py
+#   runs the same engine headless over CSV/JSONL files.
+# - Results are cached (cache.py) and kept in session_state, so
+#   reruns from downloads/widgets never re-score.
+# - Agents run concurrently (agents.py) with a pluggable backend;
+#   cards stream in as each agent finishes.
+# - Optional Monte Carlo sensitivity analysis (sensitivity.py) of
+#   RPNs, top themes and action timeline buckets.
+# - Fast cold start: pandas and altair are not imported at load;
+#   tables render from plain records and downloads are built with
+#   csv/json (exports.py), only when clicked; the roadmap can also be
+#   downloaded gzipped or as Parquet / Arrow IPC. `python startup.py`
+#   reports import time.
+# - Every run is archived to SQLite (archive.py): repeated inputs are
+#   served from the archive across restarts, and past runs can be
+#   queried below ("Run archive").
+# - Optional per-stage profiling (profiling.py): a sidebar breakdown
+#   and a Prometheus metrics file; no cost when switched off.
+# - Optional live preview (live.py): edits re-score incrementally,
+#   re-scanning only the changed paragraphs.
 # =============================================================
 
 st.set_page_config(page_title="Agentic AI CEO — 10 Leadership Agents FMEA", page_icon="🤖", layout="wide")
 
 # -----------------------------
-# Classic cases to prefill
+# Profiling (optional sidebar panel)
 # -----------------------------
-CASES = {
-    "Nokia": "Failed to adapt from feature phones to smartphone OS ecosystems (iOS/Android).",
-    "Kodak": "Underestimated the shift to digital photography despite inventing it internally.",
-    "Blockbuster": "Ignored/late to video streaming disruption and online subscription models.",
-    "Sears": "Lost retail share to e-commerce and discounters due to slow digital pivot.",
-    "Pan Am": "High fixed costs, deregulation shocks, and financial mismanagement led to collapse.",
-    "Suzuki (hypothetical)": "Should Suzuki Motor Corporation go into the food business?"
-}
-
-# -----------------------------
-# 10 Leadership Agents
-# -----------------------------
-LEADER_STYLES: Dict[str, str] = {
-    "Autocratic Leader Agentic AI Agent CEO": "Decides alone, tight control, speed over consensus.",
-    "Democratic Leader Agentic AI Agent CEO": "Seeks participation and consensus, inclusive decision-making.",
-    "Laissez-Faire Leader Agentic AI Agent CEO": "Hands-off, relies on team autonomy and initiative.",
-    "Transformational Leader Agentic AI Agent CEO": "Drives inspiring vision, change, and innovation.",
-    "Transactional Leader Agentic AI Agent CEO": "Targets performance via incentives, KPIs, and compliance.",
-    "Servant Leader Agentic AI Agent CEO": "Puts people first, grows teams, builds trust and community.",
-    "Charismatic Leader Agentic AI Agent CEO": "Inspires via presence and storytelling; rallies followers.",
-    "Situational Leader Agentic AI Agent CEO": "Adapts style to team maturity and task complexity.",
-    "Visionary Leader Agentic AI Agent CEO": "Long-term strategic focus; bold bets and roadmaps.",
-    "Bureaucratic Leader Agentic AI Agent CEO": "Follows rules and procedures; values consistency.",
-}
-
-STYLE_BIASES = {
-    # Biases adjust FMEA S/O/D (0–10). + raises risk, - lowers risk.
-    "Autocratic":        {"severity": +1, "occurrence": +1, "detection": -1},
-    "Democratic":        {"severity":  0, "occurrence": +1, "detection":  0},
-    "Laissez-Faire":     {"severity": +1, "occurrence": +2, "detection": -1},
-    "Transformational":  {"severity": +2, "occurrence": +1, "detection": -1},
-    "Transactional":     {"severity":  0, "occurrence":  0, "detection": +1},
-    "Servant":           {"severity":  0, "occurrence":  0, "detection":  0},
-    "Charismatic":       {"severity": +2, "occurrence": +1, "detection": -1},
-    "Situational":       {"severity": -1, "occurrence": -1, "detection": +1},
-    "Visionary":         {"severity": +2, "occurrence": +1, "detection": -1},
-    "Bureaucratic":      {"severity": -1, "occurrence":  0, "detection": +2},
-}
+# Times each stage of this script run (engine stages included) and, if asked,
+# traced allocations; the breakdown is filled into the sidebar at the end.
+with st.sidebar:
+    profile_on = st.checkbox("Profile stages", value=os.environ.get("PROFILE_STAGES") == "1", help=f"Time each stage of a run; cumulative totals go to {METRICS_FILE} (Prometheus text format).")
+    profile_memory = st.checkbox("Track allocations (tracemalloc, slower)", value=False, disabled=not profile_on)
+    profile_slot = st.empty()
+profile_run = start_run(profile_on, profile_memory)
 
 # -----------------------------
-# Text-driven risk themes → targeted actions
+# Rule catalog
 # -----------------------------
-# Each theme has trigger keywords and a small library of actions.
-THEMES: Dict[str, Dict] = {
-    "Market & Customer": {
-        "triggers": ["market", "customer", "demand", "pricing", "price", "churn", "subscription", "share", "competition", "competitor", "adoption", "go-to-market", "launch", "segment"],
-        "actions": [
-            {"action": "Run discovery sprints (10 interviews/segment)", "owner": "CPO", "kpi": "Validated needs / segment fit"},
-            {"action": "A/B price tests in 2 pilot markets", "owner": "CRO", "kpi": "Conversion uplift"},
-            {"action": "Spin up lightweight GTM squad (PMM+Sales)", "owner": "COO", "kpi": "Qualified pipeline"},
-        ],
-    },
-    "Product & Tech": {
-        "triggers": ["product", "feature", "roadmap", "sdk", "api", "quality", "defect", "latency", "ux", "performance", "scalability", "integration", "mvp"],
-        "actions": [
-            {"action": "Build MVP with kill-switch gates", "owner": "CTO", "kpi": "MVP readiness / P0 bugs"},
-            {"action": "Create dependency register", "owner": "PMO", "kpi": "Critical path coverage"},
-            {"action": "Hardening sprint (reliability/QA)", "owner": "CTO", "kpi": "Incident rate"},
-        ],
-    },
-    "Operations & Supply": {
-        "triggers": ["supply", "logistics", "inventory", "warehouse", "vendor", "supplier", "manufacturing", "capacity", "lead time", "production", "operations"],
-        "actions": [
-            {"action": "Dual-source critical inputs", "owner": "COO", "kpi": "Supply continuity"},
-            {"action": "S&OP weekly with red/amber gates", "owner": "COO", "kpi": "On-time fulfillment"},
-            {"action": "CO2-optimized routing + buffer stock", "owner": "COO", "kpi": "OTIF / Emissions"},
-        ],
-    },
-    "Cyber & Data": {
-        "triggers": ["cyber", "ransomware", "breach", "data", "pii", "security", "infosec", "ciso", "phishing", "encryption"],
-        "actions": [
-            {"action": "Patch & backup playbook (3-2-1)", "owner": "CISO", "kpi": "RTO/RPO compliance"},
-            {"action": "Tabletop incident drill", "owner": "CISO", "kpi": "MTTR drill score"},
-            {"action": "Zero-trust access review", "owner": "CISO", "kpi": "Least-privilege coverage"},
-        ],
-    },
-    "Legal & Compliance": {
-        "triggers": ["regulation", "regulatory", "compliance", "license", "privacy", "gdpr", "hipaa", "antitrust", "esg", "sox"],
-        "actions": [
-            {"action": "Create compliance matrix & owners", "owner": "GC", "kpi": "Control coverage"},
-            {"action": "Pre-clear regulator engagement", "owner": "GC", "kpi": "Issues pre-cleared"},
-            {"action": "Privacy impact assessment", "owner": "DPO", "kpi": "PIA completion"},
-        ],
-    },
-    "Finance": {
-        "triggers": ["revenue", "margin", "capex", "opex", "cash", "burn", "budget", "cost", "profit", "pricing"],
-        "actions": [
-            {"action": "Zero-based budget on new bet", "owner": "CFO", "kpi": "Runway / ROI"},
-            {"action": "Stage-gate investment (30/60/90)", "owner": "CFO", "kpi": "Spend vs gates"},
-            {"action": "Unit economics stress-test", "owner": "FP&A", "kpi": "CAC/LTV health"},
-        ],
-    },
-    "People & Culture": {
-        "triggers": ["layoff", "attrition", "hiring", "talent", "skills", "training", "culture", "union", "morale", "org"],
-        "actions": [
-            {"action": "Critical roles heatmap & backfills", "owner": "CHRO", "kpi": "Role coverage"},
-            {"action": "Upskill program (OKRs/quarter)", "owner": "CHRO", "kpi": "Completion / proficiency"},
-            {"action": "Change comms & listening posts", "owner": "CHRO", "kpi": "Engagement index"},
-        ],
-    },
-    "Brand & Comms": {
-        "triggers": ["brand", "pr", "reputation", "trust", "media", "investor", "stakeholder", "narrative"],
-        "actions": [
-            {"action": "Issue transparent narrative & FAQ", "owner": "CMO", "kpi": "Sentiment / coverage"},
-            {"action": "Localized comms per market", "owner": "CMO", "kpi": "Share of voice"},
-            {"action": "Investor brief with risk/mitigation", "owner": "IR", "kpi": "Investor feedback"},
-        ],
-    },
-    "AI & Ethics": {
-        "triggers": ["ai", "ml", "model", "bias", "explainability", "safety", "hallucination", "dataset"],
-        "actions": [
-            {"action": "Bias & safety checklist", "owner": "CTO", "kpi": "Checklist pass rate"},
-            {"action": "Human-in-loop for high-risk flows", "owner": "CTO", "kpi": "Override events"},
-            {"action": "Model eval suite (accuracy/robust)", "owner": "CTO", "kpi": "Eval scores"},
-        ],
-    },
-    "International & Geo": {
-        "triggers": ["tariff", "sanction", "export", "geo", "cross-border", "fx", "customs"],
-        "actions": [
-            {"action": "Tariff-mitigated routing & pricing", "owner": "COO", "kpi": "Delivered margin"},
-            {"action": "Local partners/co-dev MOUs", "owner": "CorpDev", "kpi": "Signed MOUs"},
-            {"action": "FX hedging policy review", "owner": "Treasury", "kpi": "Hedge coverage"},
-        ],
-    },
-}
-
-# FMEA keyword heuristics (impacting base S/O/D)
-RISKY_KEYWORDS = {
-    "merger": (+2, +1, -1), "acquisition": (+2, +1, -1), "layoff": (+2, +2, -1),
-    "restructure": (+1, +1, -1), "pivot": (+2, +1, -1), "ai": (+1, +1, -1),
-    "cloud": (+1, 0, 0), "shutdown": (+3, +2, -2), "outsourcing": (+1, +1, 0),
-    "offshoring": (+1, +1, 0), "automation": (+1, +1, 0), "cybersecurity": (+2, +1, +1),
-    "compliance": (+1, 0, +2), "regulation": (+1, 0, +2), "expansion": (+1, +1, -1),
-}
-
-# -----------------------------
-# Small utilities
-# -----------------------------
-
-def clamp(x: int, lo: int = 1, hi: int = 10) -> int:
-    return max(lo, min(hi, int(round(x))))
-
-
-def tokenize(text: str) -> List[str]:
-    t = text.lower()
-    for ch in ",.;:!?()[]{}|\n\t\r-/_":
-        t = t.replace(ch, " ")
-    return [w for w in t.split() if w]
-
-
-def detect_themes(problem: str, decision: str) -> Dict[str, float]:
-    """Return weighted theme scores based on keyword hits in problem+decision text."""
-    text = f"{problem} {decision}".lower()
-    tokens = tokenize(text)
-    scores: Dict[str, float] = {k: 0.0 for k in THEMES}
-    length_bonus = min(len(tokens) / 200.0, 3.0)  # complexity bonus
-    for theme, spec in THEMES.items():
-        hits = 0
-        for trig in spec["triggers"]:
-            if trig in text:
-                hits += text.count(trig)
-        # score = hits + small complexity bonus
-        scores[theme] = hits + length_bonus
-    # guarantee some mass even when no keywords match
-    if sum(scores.values()) == 0:
-        for k in scores:
-            scores[k] = 0.5
-    return scores
-
-
-def base_scores(problem: str, decision: str) -> Tuple[int, int, int]:
-    sev, occ, det = 6, 5, 5
-    text = f"{problem} {decision}".lower()
-    for kw, (ds, do, dd) in RISKY_KEYWORDS.items():
-        if kw in text:
-            sev += ds; occ += do; det += dd
-    length_factor = min(len(text) // 200, 3)
-    sev += length_factor; occ += length_factor
-    return clamp(sev), clamp(occ), clamp(det)
-
-
-def style_adjusted_scores(sev: int, occ: int, det: int, leader_name: str) -> Tuple[int, int, int]:
-    for key, bias in STYLE_BIASES.items():
-        if key in leader_name:
-            sev += bias["severity"]
-            occ += bias["occurrence"]
-            det += bias["detection"]
-            break
-    return clamp(sev), clamp(occ), clamp(det)
-
-
-def rpn_bucket(rpn: int) -> str:
-    if rpn >= 180:
-        return "0–30d"
-    if rpn >= 120:
-        return "30–60d"
-    return "60–90d"
-
-
-def pick_actions_for_theme(theme: str, n: int = 2) -> List[Dict[str, str]]:
-    lib = THEMES[theme]["actions"]
-    # rotate to avoid duplicates when many agents pick same theme
-    # (simple deterministic shuffle by theme hash)
-    idx = abs(hash(theme)) % len(lib)
-    ordered = lib[idx:] + lib[:idx]
-    return ordered[:n]
-
-
-def build_mitigations(problem: str, decision: str, leader: str, sev: int, occ: int, det: int, theme_scores: Dict[str, float]):
-    """Return a list of mitigation action dicts tailored to text + scores."""
-    rpn = sev * occ * det
-    # emphasize themes by (text score) * (severity + occurrence), lower detection => earlier timeline
-    weights = {k: v * (sev + occ) for k, v in theme_scores.items()}
-    ranked = sorted(weights.items(), key=lambda x: x[1], reverse=True)
-    top_themes = [t for t, _ in ranked[:3]]
-
-    actions = []
-    for theme in top_themes:
-        for a in pick_actions_for_theme(theme, n=2):
-            actions.append({
-                "Leader": leader,
-                "Theme": theme,
-                "Action": a["action"],
-                "Owner": a["owner"],
-                "KPI": a["kpi"],
-                "StartBy": rpn_bucket(rpn),
-                "Why": f"Elevated {theme} risk signaled by text and S={sev}, O={occ}, D={det}",
-                "RPN": rpn,
-            })
-    # add one style-specific guardrail per leader
-    style_guardrails = {
-        "Autocratic": "Create a weekly red-team review & devil's advocate gate.",
-        "Democratic": "Timebox debates and appoint a single decision owner.",
-        "Laissez-Faire": "Set biweekly OKRs and visibility dashboards.",
-        "Transformational": "Back-cast vision into 30/60/90-day deliverables.",
-        "Transactional": "Audit KPIs quarterly to prevent metric gaming.",
-        "Servant": "Balance empathy with crisp performance gates.",
-        "Charismatic": "Run pre-mortems to counter optimism bias.",
-        "Situational": "Reassess team readiness each sprint and adapt coaching.",
-        "Visionary": "Run discovery sprints; add kill-switch gates.",
-        "Bureaucratic": "Enable policy exceptions for controlled experiments.",
-    }
-    for key, tip in style_guardrails.items():
-        if key in leader:
-            actions.append({
-                "Leader": leader,
-                "Theme": "Governance",
-                "Action": tip,
-                "Owner": "CEO/PMO",
-                "KPI": "Decision latency / risk review cadence",
-                "StartBy": rpn_bucket(rpn),
-                "Why": f"Style-specific guardrail for {key} leadership.",
-                "RPN": rpn,
-            })
-            break
-    return actions
-
+# Edited rule files are picked up on the next rerun; this run uses one snapshot
+# throughout, and a broken edit keeps the last good catalog.
+reload_if_changed()
+rules = current()
+if last_error():
+    st.sidebar.warning(f"Rule catalog not reloaded, still using {rules.version}: {last_error()}")
 
 # -----------------------------
 # App UI — Inputs
@@ -303,113 +95,312 @@ with cols[4]:
 # Inputs
 pref_problem = CASES.get(chosen_case, "") if pref_fill else ""
 problem = st.text_area("Problem", value=pref_problem, height=90, placeholder="Describe the business problem…")
+# Large problem documents are streamed through the engine in chunks (ingest.py)
+problem_file = st.file_uploader("…or upload the Problem as a document (replaces the text above)", type=[e.lstrip(".") for e in TEXT_EXTENSIONS + CSV_EXTENSIONS])
 decision = st.text_area("Decision taken by CEO", height=90, placeholder="Describe the decision that has been taken…")
+legacy_match = st.checkbox("Legacy substring keyword matching", value=False, help="Reproduce scores from older versions, where short keywords also matched inside longer words.")
+live_preview = st.checkbox("Live preview (re-score on every edit)", value=False, help="Re-score whenever the Problem or Decision text changes (when a box loses focus or on Ctrl+Enter), without pressing Run. Only edited paragraphs are re-scanned; cards come straight from the rule engine.")
 
 if clear_btn:
-    st.experimental_rerun()
+    st.session_state.pop("analysis", None)
+    st.rerun()
 
 run_btn = st.button("Run FMEA with 10 Leadership Agents") or run_btn_top
 
+# -----------------------------
+# Agents
+# -----------------------------
+# AGENT_BACKEND_URL points the agents at an HTTP endpoint (e.g. an LLM
+# wrapper, or `python agents.py` for the local stub); default is the rule engine.
+AGENT_LIMITS = {
+    "concurrency": int(os.environ.get("AGENT_CONCURRENCY", len(rules.leader_names))),
+    "timeout": float(os.environ.get("AGENT_TIMEOUT", 30)),
+    "retries": int(os.environ.get("AGENT_RETRIES", 2)),
+}
+
+
+def agent_backend(delay: float):
+    url = os.environ.get("AGENT_BACKEND_URL")
+    if not url:
+        return RuleBackend(delay)
+    # HTTPBackend retries the endpoint itself; its attempts share the agent
+    # timeout, so a slow endpoint degrades to the rule card, not an error card.
+    retries = AGENT_LIMITS["retries"]
+    timeout = (AGENT_LIMITS["timeout"] - 0.1 * (2 ** retries - 1)) / (retries + 1)
+    return HTTPBackend(url, timeout=max(timeout, 0.1), base=RuleBackend(delay), retries=retries)
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+# Startup-optimized by default: the small tables (<= ~70 rows) are rendered
+# as markdown straight from the result records and the chart is drawn on
+# request, so neither pandas nor altair is imported (st.dataframe converts
+# through pandas). APP_FAST_START=0 brings back the interactive grids and
+# the always-on chart; both import their libraries lazily either way.
+FAST_START = os.environ.get("APP_FAST_START", "1") != "0"
+
+
+MARKDOWN_SPECIAL = re.compile(r"([\\`*_{}\[\]()#+\-.!|$<>~])")
+
+
+def markdown_cell(value) -> str:
+    """One table cell; free text is escaped so `*`, `_`, `$` etc. show literally (no emphasis, no LaTeX)."""
+    if isinstance(value, (int, float)):
+        return str(round(value, 3) if isinstance(value, float) else value)
+    return MARKDOWN_SPECIAL.sub(r"\\\1", str(value)).replace("\n", " ")
+
+
+def render_table(records: Sequence[Dict], columns: Optional[Sequence[str]] = None) -> None:
+    if not records:
+        return
+    columns = list(columns or records[0])
+    if not FAST_START:
+        st.dataframe([{c: r[c] for c in columns} for r in records], use_container_width=True)
+        return
+    lines = ["| " + " | ".join(markdown_cell(c) for c in columns) + " |", "|" + "---|" * len(columns)]
+    lines += ["| " + " | ".join(markdown_cell(r[c]) for c in columns) + " |" for r in records]
+    st.markdown("\n".join(lines))
+
+
+def _deferred_downloads() -> bool:
+    from streamlit.elements.widgets import button
+
+    return "Callable" in str(getattr(button, "DownloadButtonDataType", ""))
+
+
+# Streamlit releases without callable `data` get the bytes built up front.
+DEFERRED_DOWNLOADS = _deferred_downloads()
+
+
+def download_button(label: str, build: Callable[[], bytes], file_name: str, mime: str) -> None:
+    st.download_button(label, build if DEFERRED_DOWNLOADS else build(), file_name, mime)
+
+
+def render_top3_chart(rows: List[Dict]) -> None:
+    import altair as alt  # deferred until a chart is actually shown
+
+    chart = (
+        alt.Chart(alt.Data(values=rows[:3]))
+        .mark_bar()
+        .encode(x=alt.X("Leader:N"), y=alt.Y("RPN:Q"), tooltip=["Leader:N", "RPN:Q", "Severity:Q", "Occurrence:Q", "Detection:Q"])
+        .properties(height=220)
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+
+def render_agent_card(card: Dict) -> None:
+    leader = card["Leader"]
+    with st.expander(leader, expanded=False):
+        st.caption(rules.leader_styles.get(leader, ""))
+        if "error" in card:
+            st.error(f"Agent failed: {card['error']}")
+            return
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Severity", card["Severity"])
+        c2.metric("Occurrence", card["Occurrence"])
+        c3.metric("Detection", card["Detection"])
+        c4.metric("RPN", card["RPN"])
+        st.markdown(f"**Failure Mode**: {card['FailureMode']}")
+        st.markdown(f"**Effects**: {card['Effects']}")
+        if "enrichment_error" in card:
+            st.caption(f"Agent endpoint unavailable ({card['enrichment_error']}); showing rule-based text.")
+        st.markdown("**Mitigation Strategy (tailored)**")
+        render_table(card["actions"], ["Theme", "Action", "Owner", "KPI", "StartBy", "Why"])
+
+
 # -----------------------------
 # Engine
 # -----------------------------
-results_rows = []
-all_actions: List[Dict] = []
+# Results come from a process-wide LRU/TTL cache keyed by the normalized
+# text + rule-catalog version, and the last run is kept in session_state:
+# download clicks, slider moves and other reruns re-render without re-scoring.
+def score_document(label: str) -> Dict:
+    with stage("app.score"):
+        return cached_document_result(problem_file, problem_file.name, decision, label, legacy=legacy_match, catalog=rules)
+
+
+def score_text() -> Dict:
+    with stage("app.score"):
+        return cached_case_result(problem, decision, legacy=legacy_match, catalog=rules)
+
 
+fresh_run = False
 if run_btn:
-    if not problem.strip() or not decision.strip():
+    if problem_file is not None and decision.strip():
+        label = document_label(problem_file.name, problem_file.size)
+        st.session_state["analysis"] = {
+            "problem": label,
+            "decision": decision,
+            "result": score_document(label),
+            "document": problem_file.name,
+            "legacy": legacy_match,
+            "catalog": rules,  # the snapshot it was scored with (sensitivity reuses it)
+        }
+        fresh_run = True
+    elif not problem.strip() or not decision.strip():
         st.warning("Please provide both Problem and Decision taken by CEO.")
     else:
+        st.session_state["analysis"] = {
+            "problem": problem,
+            "decision": decision,
+            "result": score_text(),
+            "legacy": legacy_match,
+            "catalog": rules,
+        }
+        fresh_run = True
+elif live_preview and problem_file is None and problem.strip() and decision.strip():
+    # Live preview: one LiveCase per session keeps per-paragraph counts between
+    # reruns, so an edit re-scans only what changed (live.py).
+    live = st.session_state.get("live")
+    if live is None or live.legacy != legacy_match:
+        live = st.session_state["live"] = LiveCase(legacy=legacy_match, catalog=rules)
+    shown = st.session_state.get("analysis")
+    if live.catalog is not rules or shown is None or (shown["problem"], shown["decision"], shown["legacy"]) != (problem, decision, legacy_match):
+        with stage("app.score"):
+            result = live.update(problem, decision, rules)
+        st.session_state["analysis"] = {
+            "problem": problem,
+            "decision": decision,
+            "result": result,
+            "legacy": legacy_match,
+            "catalog": rules,
+            "cards": [rule_card(row["Leader"], result) for row in result["fmea"]],
+            "live": {"rescanned": live.rescanned, "changed": len(live.changed), "ms": live.seconds * 1e3},
+        }
+
+analysis = st.session_state.get("analysis")
+if analysis:
+    result = analysis["result"]
+    record_size("result", result)
+    # a run interrupted mid-stream (another click) has no cards yet: stream them again
+    fresh_run = fresh_run or "cards" not in analysis
+
+    if fresh_run:
         st.info("Running agents…")
-        st.markdown("---")
-
-        theme_scores = detect_themes(problem, decision)
-        sev0, occ0, det0 = base_scores(problem, decision)
-
-        for leader, desc in LEADER_STYLES.items():
+    elif "live" in analysis:
+        stats = analysis["live"]
+        st.caption(f"Live preview — re-scanned {stats['rescanned']} paragraph(s), {stats['changed']} leader(s) re-scored in {stats['ms']:.1f} ms.")
+    else:
+        st.caption("Showing results of the last run.")
+    st.markdown("---")
+
+    if fresh_run:
+        # All agents run concurrently; each card replaces its placeholder as it finishes.
+        leaders = [row["Leader"] for row in result["fmea"]]
+        slots = {leader: st.empty() for leader in leaders}
+        for leader, slot in slots.items():
             # Visual thinking placeholder
-            ph = st.empty()
-            ph.info(f"Thinking… ({leader})")
-            time.sleep(delay)
-            ph.empty()
-
-            sev, occ, det = style_adjusted_scores(sev0, occ0, det0, leader)
-            rpn = sev * occ * det
-
-            # Build context-aware mitigations
-            mitig = build_mitigations(problem, decision, leader, sev, occ, det, theme_scores)
-            all_actions.extend(mitig)
-
-            with st.expander(leader, expanded=False):
-                st.caption(desc)
-                c1, c2, c3, c4 = st.columns(4)
-                c1.metric("Severity", sev)
-                c2.metric("Occurrence", occ)
-                c3.metric("Detection", det)
-                c4.metric("RPN", rpn)
-                st.markdown("**Failure Mode**: Execution gaps, misalignment, and unintended consequences while applying the decision through the lens of this leadership style.")
-                st.markdown("**Effects**: Delays, cost overruns, quality issues, compliance risks, or missed market opportunities.")
-                actions_df = pd.DataFrame(mitig)[["Theme", "Action", "Owner", "KPI", "StartBy", "Why"]]
-                st.markdown("**Mitigation Strategy (tailored)**")
-                st.dataframe(actions_df, use_container_width=True)
-
-            results_rows.append({
-                "Leader": leader,
-                "Severity": sev,
-                "Occurrence": occ,
-                "Detection": det,
-                "RPN": rpn,
-            })
+            slot.info(f"Thinking… ({leader})")
+        cards: Dict[str, Dict] = {}
+        ctx = agent_context(analysis["problem"], analysis["decision"], result)
+
+        async def stream_cards() -> None:
+            async for card in run_agents(agent_backend(delay), leaders, ctx, **AGENT_LIMITS):
+                cards[card["Leader"]] = card
+                with slots[card["Leader"]].container():
+                    render_agent_card(card)
+
+        with stage("app.agents"):
+            asyncio.run(stream_cards())
+        analysis["cards"] = [cards[leader] for leader in leaders]
+    else:
+        with stage("app.render.cards"):
+            for card in analysis["cards"]:
+                render_agent_card(card)
 
+    if fresh_run:
         st.success("All agents finished.")
 
-        # -----------------------------
-        # Summary & Combined Roadmap
-        # -----------------------------
-        st.subheader("Summary of Results")
-        res_df = pd.DataFrame(results_rows).sort_values("RPN", ascending=False)
-        st.dataframe(res_df, use_container_width=True)
-
-        # Top 3 bar chart
-        top3 = res_df.head(3)
-        chart = (
-            alt.Chart(top3)
-            .mark_bar()
-            .encode(x=alt.X("Leader:N"), y=alt.Y("RPN:Q"), tooltip=["Leader", "RPN", "Severity", "Occurrence", "Detection"])
-            .properties(height=220)
-        )
-        st.altair_chart(chart, use_container_width=True)
-
-        # Combined roadmap: aggregate actions by (Action, Owner, Theme, StartBy)
-        act_df = pd.DataFrame(all_actions)
-        # weight = sum of contributing RPNs (higher -> earlier priority)
-        grouped = (
-            act_df
-            .groupby(["Action", "Owner", "Theme", "KPI", "StartBy"], as_index=False)
-            .agg({"RPN": "sum", "Leader": lambda s: ", ".join(sorted(set(s))), "Why": lambda s: "; ".join(sorted(set(s)))})
-            .rename(columns={"RPN": "Weight", "Leader": "SupportedBy", "Why": "Rationale"})
-            .sort_values(["StartBy", "Weight"], ascending=[True, False])
+    # -----------------------------
+    # Summary & Combined Roadmap
+    # -----------------------------
+    st.subheader("Summary of Results")
+    with stage("app.render.summary"):
+        summary_rows = fmea_rows(result)
+        render_table(summary_rows)
+
+    # Top 3 bar chart
+    if not FAST_START or st.checkbox("Show top-3 RPN chart", value=False):
+        with stage("app.render.chart"):
+            render_top3_chart(summary_rows)
+
+    # Combined roadmap: aggregate actions by (Action, Owner, Theme, KPI, StartBy)
+    st.subheader("Mitigation suggestions (combined) — Risk-weighted roadmap")
+    st.caption("Actions are derived from your text + each leader's FMEA. Timeline buckets reflect RPN (0–30d / 30–60d / 60–90d).")
+    with stage("app.render.roadmap"):
+        roadmap_rows = result["roadmap"].records()
+        render_table(roadmap_rows)
+    record_size("roadmap_rows", roadmap_rows)
+
+    # Downloads — each file is built only when its button is clicked, so
+    # reruns (widgets, other downloads) never serialize anything.
+    payload = partial(results_payload, analysis["problem"], analysis["decision"], result)
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        download_button("Download FMEA Scores (CSV)", partial(fmea_csv, result), "fmea_scores.csv", "text/csv")
+    with c2:
+        fmt = st.selectbox("Mitigations format", roadmap_formats(), help="gzip, Parquet and Arrow IPC are smaller/faster for large roadmaps.")
+        ext, mime, _ = ROADMAP_FORMATS[fmt]
+        download_button(
+            "Download Mitigations", partial(roadmap_bytes, result["roadmap"], fmt), "mitigation_roadmap" + ext, mime,
         )
+    with c3:
+        download_button("Download Full Results (JSON)", lambda: results_json(payload()), "results.json", "application/json")
+
+    # -----------------------------
+    # Sensitivity analysis (Monte Carlo)
+    # -----------------------------
+    # Off by default; the point inputs and the last simulation are kept in
+    # the session analysis, so reruns only re-simulate when a knob changes.
+    if st.checkbox("Sensitivity analysis (Monte Carlo)", value=False, help="Perturb keyword deltas, style biases and theme weights and see how stable the RPNs, top themes and timeline buckets are."):
+        sc = st.columns(4)
+        # capped at what simulates in well under a second here (500k ≈ 0.6 s); simulate() itself takes any count
+        samples = sc[0].select_slider("Samples", options=[10_000, 50_000, 100_000, 200_000, 500_000], value=200_000)
+        keyword_sigma = sc[1].slider("Keyword delta σ", 0.0, 2.0, 0.5, 0.1, help="Per matched risk keyword and S/O/D component.")
+        style_sigma = sc[2].slider("Style bias σ", 0.0, 2.0, 0.5, 0.1, help="Per leader and S/O/D component.")
+        theme_sigma = sc[3].slider("Theme weight σ (log-normal)", 0.0, 1.0, 0.25, 0.05)
+        params = (samples, keyword_sigma, style_sigma, theme_sigma)
+
+        if "sensitivity_inputs" not in analysis:
+            if "document" not in analysis:
+                analysis["sensitivity_inputs"] = case_inputs(analysis["problem"], analysis["decision"], analysis["legacy"], analysis.get("catalog", rules))
+            elif problem_file is not None and problem_file.name == analysis["document"]:
+                analysis["sensitivity_inputs"] = document_inputs(problem_file, problem_file.name, analysis["decision"], analysis["legacy"], analysis.get("catalog", rules))
+        if "sensitivity_inputs" not in analysis:
+            st.info("Upload the problem document again to run the sensitivity analysis.")
+        else:
+            sens = analysis.get("sensitivity")
+            if sens is None or sens["key"] != params:
+                with st.spinner("Simulating…"), stage("app.sensitivity"):
+                    sens = {"key": params, "report": simulate(analysis["sensitivity_inputs"], samples, keyword_sigma, style_sigma, theme_sigma)}
+                analysis["sensitivity"] = sens
+            report = sens["report"]
+            st.caption(f"{report['samples']:,} samples (seed {report['params']['seed']}). Top-3 theme set unchanged in {report['top3_stability']:.1%} of samples.")
+            st.markdown("**RPN and timeline bucket by leader**")
+            render_table(report["leaders"])
+            st.markdown("**Theme ranking**")
+            render_table(report["themes"])
+            st.markdown("**Action timeline buckets** (earliest StartBy across leaders)")
+            render_table(report["actions"])
 
-        st.subheader("Mitigation suggestions (combined) — Risk-weighted roadmap")
-        st.caption("Actions are derived from your text + each leader's FMEA. Timeline buckets reflect RPN (0–30d / 30–60d / 60–90d).")
-        st.dataframe(grouped, use_container_width=True)
-
-        # Downloads
-        c1, c2, c3 = st.columns(3)
-        with c1:
-            st.download_button("Download FMEA Scores (CSV)", res_df.to_csv(index=False).encode(), "fmea_scores.csv", "text/csv")
-        with c2:
-            st.download_button("Download Mitigations (CSV)", grouped.to_csv(index=False).encode(), "mitigation_roadmap.csv", "text/csv")
-        with c3:
-            payload = {
-                "problem": problem,
-                "decision": decision,
-                "theme_scores": theme_scores,
-                "fmea": results_rows,
-                "actions": grouped.to_dict(orient="records"),
-            }
-            st.download_button("Download Full Results (JSON)", pd.io.json.dumps(payload, indent=2).encode(), "results.json", "application/json")
+# -----------------------------
+# Run archive
+# -----------------------------
+# An expander's body runs on every rerun even when collapsed, so the queries
+# sit behind a toggle and only run while the panel is open.
+archive = default_archive()
+if archive is not None and st.toggle("Run archive — past runs", value=False, key="archive_open"):
+    with st.container(border=True), stage("app.archive"):
+        stats = archive.stats()
+        st.caption(f"{stats['runs']:,} distinct runs, {stats['submissions']:,} submissions ({stats['duplicates']:,} served from the archive or cache).")
+        st.markdown("**Top themes by cumulative RPN — this quarter**")
+        render_table(archive.top_themes(since=quarter_start()))
+        ac = st.columns([2, 1])
+        leader_q = ac[0].selectbox("Runs where leader", list(rules.leader_names), key="archive_leader")
+        min_rpn = ac[1].number_input("has RPN ≥", 1, 1000, 180, key="archive_min_rpn")
+        st.caption(f"{archive.count_where(leader_q, int(min_rpn)):,} matching runs (top 50 by RPN shown).")
+        render_table(archive.runs_where(leader_q, int(min_rpn), limit=50))
 
 # -----------------------------
 # Help / Notes
@@ -418,11 +409,23 @@ st.markdown("""
 ---
 **How to use**
 1. (Optional) choose a classic case → click **Use case text** to prefill.
-2. Describe your **Problem** and the **Decision taken by the CEO**.
-3. Click **Run FMEA with 10 Leadership Agents**.
+2. Describe your **Problem** (or upload it as a txt/markdown/CSV document) and the **Decision taken by the CEO**.
+3. Click **Run FMEA with 10 Leadership Agents** (or tick **Live preview** to re-score as you edit).
 4. Expand each agent panel for tailored mitigations. Review the **Summary** for a risk‑weighted combined roadmap.
 
 **Notes**
 - Purely rule-based, no external APIs — safe for Streamlit Free.
 - When you later add an open-source LLM endpoint, you can enrich the "Failure Mode" text or generate more actions per theme; the scoring/roadmap logic will remain compatible.
 """)
+
+# -----------------------------
+# Profiling breakdown
+# -----------------------------
+finish_run(profile_run)
+if profile_run is not None:
+    with profile_slot.container():
+        st.caption(f"This run: {profile_run.seconds * 1e3:.1f} ms server-side (stages nest; Streamlit's browser-side rendering is not included).")
+        render_table(profile_run.rows())
+        if profile_run.memory:
+            st.caption(f"Peak traced memory: {profile_run.peak_bytes / 1024:.0f} KB")
+        render_table(profile_run.size_rows())
@@ -0,0 +1,481 @@
+import argparse
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from catalog import current
+from roadmap import RoadmapAggregator
+
+# =============================================================
+# Agentic AI CEO — persistent run archive
+# -------------------------------------------------------------
+# Every scored case goes into a local SQLite file (WAL mode,
+# results stored as zlib-compressed JSON),
+# indexed by the same content hash as the in-memory cache
+# (cache.cache_key: normalized text + catalog version + matcher
+# mode). Identical submissions share one run row and only append
+# to `submissions`; a later submission gets the archived result
+# back without re-scoring, even after a restart.
+#
+# Queries read two narrow, indexed side tables instead of the
+# result JSON:
+#   leader_rpn (leader_id, rpn, ts, run_id ...)  "Autocratic RPN >= 180"
+#   theme_rpn  (ts, theme, weight ...)  "top themes by cumulative
+#                                        RPN this quarter"
+# where a theme's weight is its summed roadmap Weight in that run.
+# theme_day keeps those weights rolled up per local calendar day,
+# so "this quarter" (or any whole-day window) sums a few hundred
+# rows instead of scanning every run's themes.
+#
+# Writes are queued and committed by one background thread in
+# batches (one transaction per batch), so recording a run never
+# waits on disk. Rows are only ever inserted. A batch that fails
+# (e.g. "database is locked" with several processes on one file)
+# is retried, then dropped and logged; the writer keeps going, and
+# if it ever stops, record() and flush() stop queueing/waiting.
+#
+#   python archive.py stats
+#   python archive.py top-themes --since quarter
+#   python archive.py runs --leader Autocratic --min-rpn 180
+#
+# RUN_ARCHIVE sets the file (default runs.sqlite3); RUN_ARCHIVE=""
+# turns the archive off.
+# =============================================================
+
+DEFAULT_PATH = "runs.sqlite3"
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    ts REAL NOT NULL,
+    catalog_version TEXT NOT NULL,
+    legacy INTEGER NOT NULL,
+    problem TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    result BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_ts ON runs (ts);
+CREATE TABLE IF NOT EXISTS submissions (
+    run_id INTEGER NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leaders (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS leader_rpn (
+    run_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    leader_id INTEGER NOT NULL,
+    severity INTEGER NOT NULL,
+    occurrence INTEGER NOT NULL,
+    detection INTEGER NOT NULL,
+    rpn INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leader_rpn_idx ON leader_rpn (leader_id, rpn, ts, run_id);
+CREATE TABLE IF NOT EXISTS theme_rpn (
+    run_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    theme TEXT NOT NULL,
+    weight INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS theme_rpn_idx ON theme_rpn (ts, theme, weight);
+CREATE TABLE IF NOT EXISTS theme_day (
+    day INTEGER NOT NULL,
+    theme TEXT NOT NULL,
+    weight INTEGER NOT NULL,
+    runs INTEGER NOT NULL,
+    PRIMARY KEY (day, theme)
+) WITHOUT ROWID;
+"""
+
+# local midnight (unix time) of a unix timestamp, as theme_day.day
+DAY_SQL = "CAST(strftime('%s', date({ts}, 'unixepoch', 'localtime'), 'utc') AS INTEGER)"
+PREVIEW_CHARS = 200
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def resolve_leader(name: str, leaders: Optional[List[str]] = None) -> str:
+    """Full leader name for a full or short name ("Autocratic"); default: the active catalog's leaders."""
+    leaders = current().leader_names if leaders is None else leaders
+    if name in leaders:
+        return name
+    matches = [leader for leader in leaders if leader.lower().startswith(name.lower())]
+    if len(matches) != 1:
+        raise ValueError(f"unknown or ambiguous leader: {name!r}")
+    return matches[0]
+
+
+def day_start(ts: float) -> float:
+    """Local midnight of the day containing ``ts``."""
+    day = datetime.fromtimestamp(ts)
+    return datetime(day.year, day.month, day.day).timestamp()
+
+
+def quarter_start(ts: Optional[float] = None) -> float:
+    """Start (local time) of the calendar quarter containing ``ts`` (default: now)."""
+    now = datetime.fromtimestamp(time.time() if ts is None else ts)
+    return datetime(now.year, 3 * ((now.month - 1) // 3) + 1, 1).timestamp()
+
+
+def parse_since(value: Optional[str]) -> Optional[float]:
+    """CLI/time filter: None, "quarter", "month", "year" or an ISO date/datetime."""
+    if not value:
+        return None
+    now = datetime.now()
+    if value == "quarter":
+        return quarter_start()
+    if value == "month":
+        return datetime(now.year, now.month, 1).timestamp()
+    if value == "year":
+        return datetime(now.year, 1, 1).timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+def pack(result: Dict) -> bytes:
+    # the per-leader actions repeat long rationale strings; zlib shrinks them ~12x
+    return zlib.compress(json.dumps(result, ensure_ascii=False).encode(), 1)
+
+
+def unpack(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob))
+
+
+def theme_weights(result: Dict) -> Dict[str, int]:
+    """Summed roadmap Weight per theme (the theme's cumulative RPN in this run)."""
+    weights: Dict[str, int] = {}
+    for row in result["roadmap"].records():
+        weights[row["Theme"]] = weights.get(row["Theme"], 0) + row["Weight"]
+    return weights
+
+
+class RunArchive:
+    """Append-only SQLite run store with a content-hash index and a batching writer thread."""
+
+    def __init__(self, path: str = DEFAULT_PATH, batch_size: int = 500, flush_interval: float = 0.5, retries: int = 3):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        # submissions given up on, and why the latest write failed
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+        self._read = connect(path)
+        self._read.executescript(SCHEMA)
+        with self._read:
+            self._read.executemany("INSERT OR IGNORE INTO leaders (name) VALUES (?)", [(name,) for name in current().leader_names])
+        self._backfill_theme_days()
+        # grows when a reloaded catalog brings new leaders (see _leader_id)
+        self._leader_ids = {name: i for i, name in self._read.execute("SELECT id, name FROM leaders")}
+        self._read_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        # queued but not yet committed, so get() sees its own writes
+        self._pending: Dict[str, Dict] = {}
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="run-archive-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _backfill_theme_days(self) -> None:
+        """Fill theme_day from theme_rpn for archives written before the rollup existed."""
+        if self._read.execute("SELECT 1 FROM theme_day LIMIT 1").fetchone():
+            return
+        self._read.execute("BEGIN IMMEDIATE")
+        try:
+            if not self._read.execute("SELECT 1 FROM theme_day LIMIT 1").fetchone():
+                self._read.execute(
+                    f"INSERT INTO theme_day (day, theme, weight, runs)"
+                    f" SELECT {DAY_SQL.format(ts='ts')} AS d, theme, SUM(weight), COUNT(*) FROM theme_rpn GROUP BY d, theme"
+                )
+            self._read.commit()
+        except BaseException:
+            self._read.rollback()
+            raise
+
+    # -- writes --
+
+    def record(
+        self,
+        key: str,
+        problem: str,
+        decision: str,
+        result: Dict,
+        legacy: bool = False,
+        ts: Optional[float] = None,
+        version: Optional[str] = None,
+    ) -> None:
+        """Queue one submission of a scored case (``version``: its catalog version); returns immediately.
+
+        Nothing is queued once the writer thread has stopped (see last_error).
+        """
+        if self._closed:
+            raise ValueError("archive closed")
+        if not self._writer.is_alive():
+            self.dropped += 1
+            return
+        with self._pending_lock:
+            self._pending.setdefault(key, result)
+        self._queue.put((key, problem, decision, result, legacy, time.time() if ts is None else ts, version or current().version))
+
+    def flush(self) -> None:
+        """Block until everything queued so far is committed (or given up on)."""
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(self.flush_interval):
+            if not self._writer.is_alive():
+                return
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._writer.join()
+            self._read.close()
+
+    def _write_loop(self) -> None:
+        try:
+            conn = connect(self.path)
+        except sqlite3.Error as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            log.error("run archive %s: writer could not connect: %s", self.path, self.last_error)
+            return
+        stop = False
+        while not stop:
+            try:
+                items = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [i for i in items if isinstance(i, tuple)]
+            try:
+                if rows:
+                    self._commit(conn, rows)
+            finally:
+                with self._pending_lock:
+                    for row in rows:
+                        self._pending.pop(row[0], None)
+                for item in items:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        item.set()
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, rows: List[Tuple]) -> None:
+        """One transaction for the batch; retried while the file is locked/busy, then dropped."""
+        for attempt in range(self.retries + 1):
+            try:
+                with conn:
+                    for row in rows:
+                        self._insert(conn, *row)
+                return
+            except sqlite3.OperationalError as exc:  # locked / busy: another process is writing
+                error: Exception = exc
+                if attempt < self.retries:
+                    time.sleep(0.1 * 2 ** attempt)
+            except Exception as exc:  # bad row or broken file: retrying will not help
+                error = exc
+                break
+        # a rolled-back batch may have cached ids of leaders it inserted
+        try:
+            self._leader_ids = {name: i for i, name in conn.execute("SELECT id, name FROM leaders")}
+        except sqlite3.Error:
+            pass
+        self.dropped += len(rows)
+        self.last_error = f"{type(error).__name__}: {error}"
+        log.error("run archive %s: dropped %d submission(s) after %s", self.path, len(rows), self.last_error)
+
+    def _leader_id(self, conn: sqlite3.Connection, name: str) -> int:
+        leader_id = self._leader_ids.get(name)
+        if leader_id is None:
+            conn.execute("INSERT OR IGNORE INTO leaders (name) VALUES (?)", (name,))
+            leader_id = self._leader_ids[name] = conn.execute("SELECT id FROM leaders WHERE name = ?", (name,)).fetchone()[0]
+        return leader_id
+
+    def _insert(self, conn: sqlite3.Connection, key: str, problem: str, decision: str, result: Dict, legacy: bool, ts: float, version: str) -> None:
+        found = conn.execute("SELECT id FROM runs WHERE key = ?", (key,)).fetchone()
+        if found:
+            conn.execute("INSERT INTO submissions (run_id, ts) VALUES (?, ?)", (found[0], ts))
+            return
+        stored = {k: result[k] for k in ("theme_scores", "fmea", "actions")}
+        run_id = conn.execute(
+            "INSERT INTO runs (key, ts, catalog_version, legacy, problem, decision, result) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, ts, version, int(legacy), problem, decision, pack(stored)),
+        ).lastrowid
+        conn.execute("INSERT INTO submissions (run_id, ts) VALUES (?, ?)", (run_id, ts))
+        conn.executemany(
+            "INSERT INTO leader_rpn (run_id, ts, leader_id, severity, occurrence, detection, rpn) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, ts, self._leader_id(conn, r["Leader"]), r["Severity"], r["Occurrence"], r["Detection"], r["RPN"]) for r in result["fmea"]],
+        )
+        weights = theme_weights(result).items()
+        conn.executemany(
+            "INSERT INTO theme_rpn (run_id, ts, theme, weight) VALUES (?, ?, ?, ?)",
+            [(run_id, ts, theme, weight) for theme, weight in weights],
+        )
+        conn.executemany(
+            f"INSERT INTO theme_day (day, theme, weight, runs) VALUES ({DAY_SQL.format(ts='?')}, ?, ?, 1)"
+            " ON CONFLICT (day, theme) DO UPDATE SET weight = weight + excluded.weight, runs = runs + 1",
+            [(ts, theme, weight) for theme, weight in weights],
+        )
+
+    # -- reads --
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Dict]:
+        with self._read_lock:
+            cur = self._read.execute(sql, params)
+            cols = [c[0] for c in cur.description]
+            return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    def get(self, key: str) -> Optional[Dict]:
+        """The archived result for a cache key (as engine.case_result() returns it), or None."""
+        with self._pending_lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            return pending
+        rows = self._query("SELECT result FROM runs WHERE key = ?", (key,))
+        if not rows:
+            return None
+        result = unpack(rows[0]["result"])
+        result["roadmap"] = RoadmapAggregator(result["actions"])
+        return result
+
+    def stats(self) -> Dict:
+        # rows are only ever inserted, so the largest rowid is the row count (COUNT(*) scans the table)
+        runs = self._query(
+            "SELECT (SELECT COALESCE(MAX(id), 0) FROM runs) AS n,"
+            " (SELECT MIN(ts) FROM runs) AS first, (SELECT MAX(ts) FROM runs) AS last"
+        )[0]
+        submissions = self._query("SELECT COALESCE(MAX(rowid), 0) AS n FROM submissions")[0]["n"]
+        return {"runs": runs["n"], "submissions": submissions, "duplicates": submissions - runs["n"], "first_ts": runs["first"], "last_ts": runs["last"]}
+
+    @staticmethod
+    def _window(since: Optional[float], until: Optional[float], column: str = "ts") -> Tuple[str, Tuple]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append(f"{column} < ?")
+            params.append(until)
+        return " AND ".join(clauses), tuple(params)
+
+    def top_themes(self, since: Optional[float] = None, until: Optional[float] = None, limit: int = 10) -> List[Dict]:
+        """Themes by cumulative roadmap RPN over runs archived in [since, until).
+
+        Whole-day windows (bounds at local midnight, e.g. quarter_start()) read
+        the theme_day rollup; other bounds scan theme_rpn.
+        """
+        if all(bound is None or day_start(bound) == bound for bound in (since, until)):
+            where, params = self._window(since, until, "day")
+            return self._query(
+                f"SELECT theme AS Theme, SUM(weight) AS CumulativeRPN, SUM(runs) AS Runs FROM theme_day"
+                f"{' WHERE ' + where if where else ''} GROUP BY theme ORDER BY CumulativeRPN DESC LIMIT ?",
+                params + (limit,),
+            )
+        where, params = self._window(since, until)
+        return self._query(
+            f"SELECT theme AS Theme, SUM(weight) AS CumulativeRPN, COUNT(*) AS Runs FROM theme_rpn"
+            f"{' WHERE ' + where if where else ''} GROUP BY theme ORDER BY CumulativeRPN DESC LIMIT ?",
+            params + (limit,),
+        )
+
+    def runs_where(
+        self,
+        leader: str,
+        min_rpn: int = 1,
+        max_rpn: int = 1000,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[Dict]:
+        """Runs where ``leader``'s RPN is in [min_rpn, max_rpn], highest RPN first (texts cut to PREVIEW_CHARS)."""
+        where, params = self._window(since, until, "l.ts")
+        return self._query(
+            "SELECT r.id AS run, datetime(r.ts, 'unixepoch', 'localtime') AS archived, substr(r.problem, 1, ?) AS Problem, substr(r.decision, 1, ?) AS Decision,"
+            " l.severity AS Severity, l.occurrence AS Occurrence, l.detection AS Detection, l.rpn AS RPN"
+            " FROM leader_rpn l JOIN runs r ON r.id = l.run_id"
+            f" WHERE l.leader_id = ? AND l.rpn BETWEEN ? AND ?{' AND ' + where if where else ''}"
+            " ORDER BY l.rpn DESC, l.ts DESC LIMIT ?",
+            (PREVIEW_CHARS, PREVIEW_CHARS, self._leader_ids[resolve_leader(leader, list(self._leader_ids))], min_rpn, max_rpn) + params + (limit,),
+        )
+
+    def count_where(self, leader: str, min_rpn: int = 1, max_rpn: int = 1000, since: Optional[float] = None, until: Optional[float] = None) -> int:
+        where, params = self._window(since, until)
+        return self._query(
+            f"SELECT COUNT(*) AS n FROM leader_rpn WHERE leader_id = ? AND rpn BETWEEN ? AND ?{' AND ' + where if where else ''}",
+            (self._leader_ids[resolve_leader(leader, list(self._leader_ids))], min_rpn, max_rpn) + params,
+        )[0]["n"]
+
+
+_DEFAULT: Optional[RunArchive] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_archive() -> Optional[RunArchive]:
+    """Process-wide archive at $RUN_ARCHIVE (opened on first use); None when disabled."""
+    global _DEFAULT
+    path = os.environ.get("RUN_ARCHIVE", DEFAULT_PATH)
+    if not path:
+        return None
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = RunArchive(path)
+    return _DEFAULT
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Query the persistent run archive.")
+    ap.add_argument("--db", default=os.environ.get("RUN_ARCHIVE") or DEFAULT_PATH, help="archive file")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="run / submission counts")
+    p = sub.add_parser("top-themes", help="themes by cumulative roadmap RPN")
+    p.add_argument("--since", help='"quarter", "month", "year" or an ISO date')
+    p.add_argument("--limit", type=int, default=10)
+    p = sub.add_parser("runs", help="runs where a leader's RPN is in a range")
+    p.add_argument("--leader", required=True, help='leader name or prefix, e.g. "Autocratic"')
+    p.add_argument("--min-rpn", type=int, default=1)
+    p.add_argument("--max-rpn", type=int, default=1000)
+    p.add_argument("--since", help='"quarter", "month", "year" or an ISO date')
+    p.add_argument("--limit", type=int, default=100)
+    args = ap.parse_args(argv)
+
+    archive = RunArchive(args.db)
+    try:
+        if args.cmd == "stats":
+            out = archive.stats()
+        elif args.cmd == "top-themes":
+            out = archive.top_themes(parse_since(args.since), limit=args.limit)
+        else:
+            out = archive.runs_where(args.leader, args.min_rpn, args.max_rpn, parse_since(args.since), limit=args.limit)
+    finally:
+        archive.close()
+    json.dump(out, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
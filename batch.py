@@ -0,0 +1,249 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from engine import case_results, results_payload
+from exports import iter_roadmap, roadmap_format_for
+from roadmap import RoadmapAggregator
+
+# =============================================================
+# Agentic AI CEO — headless batch runner
+# -------------------------------------------------------------
+# Streams problem/decision cases from CSV or JSONL, scores them
+# in chunks across a process pool and writes one result per case
+# as it completes (input order is preserved).
+#
+#   python batch.py cases.csv -o results.jsonl --workers 8
+#   python batch.py cases.jsonl -o results.csv --format csv
+#   python batch.py cases.csv -o results.jsonl --roadmap portfolio.csv
+#   python batch.py cases.csv -o results.jsonl --roadmap portfolio.parquet
+#
+# Input columns/keys: problem, decision and an optional id.
+# Rows that cannot be scored (bad JSON, missing or non-string
+# problem/decision) get an {"id", "error"} result; the run goes on.
+# Each JSONL result is the same payload as the UI's
+# "Download Full Results (JSON)" button, plus the case id.
+# =============================================================
+
+INCOMPLETE = "Please provide both Problem and Decision taken by CEO."
+CSV_FIELDS = ["id", "Leader", "Severity", "Occurrence", "Detection", "RPN", "StartBy", "Mitigations", "error"]
+
+
+# -----------------------------
+# Input
+# -----------------------------
+
+def read_cases(fh: TextIO, fmt: str) -> Iterator[Dict]:
+    """Yield {"id", "problem", "decision"} dicts lazily from a CSV or JSONL stream.
+
+    A line that is not JSON becomes a case with an "error" (see case_from_row).
+    """
+    if fmt == "csv":
+        for n, row in enumerate(csv.DictReader(fh), start=1):
+            yield case_from_row(row, n)
+        return
+    n = 0
+    for line in fh:
+        if not line.strip():
+            continue
+        n += 1
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield invalid_case(n, f"line is not JSON: {exc}")
+            continue
+        yield case_from_row(row, n)
+
+
+def invalid_case(n: int, message: str) -> Dict:
+    return {"id": str(n), "problem": "", "decision": "", "error": message}
+
+
+def case_from_row(row, n: int) -> Dict:
+    """Normalize one input row; ``n`` (1-based position) is the fallback id.
+
+    A row that cannot be scored (not an object, non-string problem or
+    decision) gets an "error" message instead of stopping the run.
+    """
+    if not isinstance(row, dict):
+        return invalid_case(n, f"case must be an object, not {type(row).__name__}")
+    case_id = row.get("id")
+    case = {"id": str(n) if case_id is None else case_id}
+    for field in ("problem", "decision"):
+        value = row.get(field)
+        if value is None:
+            value = ""
+        elif not isinstance(value, str):
+            case["error"] = f"{field} must be a string, not {type(value).__name__}"
+            value = ""
+        case[field] = value
+    return case
+
+
+def guess_format(path: str, default: str = "jsonl") -> str:
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        return "csv"
+    if lower.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return default
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+
+def is_complete(case: Dict) -> bool:
+    return "error" not in case and bool(case["problem"].strip() and case["decision"].strip())
+
+
+def score_chunk(chunk: List[Dict], legacy: bool = False, with_roadmap: bool = False) -> Tuple[List[Dict], Optional[RoadmapAggregator]]:
+    """Score a chunk of cases; S/O/D for the whole chunk is one vectorized call.
+
+    With ``with_roadmap`` the chunk's combined roadmap is returned too, as a
+    partial aggregate for the parent to merge.
+    """
+    valid = [c for c in chunk if is_complete(c)]
+    scored = iter(case_results([(c["problem"], c["decision"]) for c in valid], legacy))
+    partial = RoadmapAggregator() if with_roadmap else None
+    out = []
+    for case in chunk:
+        if is_complete(case):
+            result = next(scored)
+            out.append({"id": case["id"], **results_payload(case["problem"], case["decision"], result)})
+            if partial is not None:
+                partial.merge(result["roadmap"])
+        else:
+            out.append({"id": case["id"], "error": case.get("error", INCOMPLETE)})
+    return out, partial
+
+
+def chunked(it: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(
+    cases: Iterable[Dict],
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    legacy: bool = False,
+    roadmap: Optional[RoadmapAggregator] = None,
+) -> Iterator[Dict]:
+    """Score cases across a process pool, yielding results in input order.
+
+    At most ``2 * workers`` chunks are in flight, so memory stays bounded
+    no matter how large the input file is. If ``roadmap`` is given, every
+    worker's partial roadmap is merged into it (portfolio-wide roadmap).
+    """
+    with_roadmap = roadmap is not None
+
+    def collect(scored: Tuple[List[Dict], Optional[RoadmapAggregator]]) -> List[Dict]:
+        results, partial = scored
+        if partial is not None:
+            roadmap.merge(partial)
+        return results
+
+    if workers == 1:
+        for chunk in chunked(cases, chunksize):
+            yield from collect(score_chunk(chunk, legacy, with_roadmap))
+        return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = 2 * workers
+        pending: deque = deque()
+        for chunk in chunked(cases, chunksize):
+            pending.append(pool.submit(score_chunk, chunk, legacy, with_roadmap))
+            if len(pending) >= window:
+                yield from collect(pending.popleft().result())
+        while pending:
+            yield from collect(pending.popleft().result())
+
+
+# -----------------------------
+# Output
+# -----------------------------
+
+def csv_rows(result: Dict) -> Iterator[Dict]:
+    """Flatten one case result into one row per leader."""
+    if "error" in result:
+        yield {"id": result["id"], "error": result["error"]}
+        return
+    for row in result["fmea"]:
+        leader = row["Leader"]
+        mine = [a for a in result["actions"] if leader in a["SupportedBy"].split(", ")]
+        yield {
+            "id": result["id"],
+            **row,
+            "StartBy": mine[0]["StartBy"] if mine else "",
+            "Mitigations": "; ".join(a["Action"] for a in mine),
+        }
+
+
+def write_results(results: Iterable[Dict], out: TextIO, fmt: str) -> int:
+    n = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for res in results:
+            writer.writerows(csv_rows(res))
+            n += 1
+    else:
+        for res in results:
+            out.write(json.dumps(res, ensure_ascii=False))
+            out.write("\n")
+            n += 1
+    return n
+
+
+def write_roadmap(roadmap: RoadmapAggregator, path: str) -> None:
+    """Write the roadmap chunk by chunk; the format follows the extension (.csv, .csv.gz, .parquet, .arrow/.feather)."""
+    with open(path, "wb") as fh:
+        for chunk in iter_roadmap(roadmap.records(), roadmap_format_for(path)):
+            fh.write(chunk)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Score problem/decision cases with the 10 leadership agents (FMEA).")
+    ap.add_argument("input", help="CSV or JSONL file with problem/decision columns ('-' for stdin)")
+    ap.add_argument("-o", "--output", default="-", help="output file ('-' for stdout)")
+    ap.add_argument("--input-format", choices=["csv", "jsonl"], help="default: guessed from extension")
+    ap.add_argument("--format", choices=["csv", "jsonl"], help="output format (default: guessed from extension, else jsonl)")
+    ap.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count, 1 = in-process)")
+    ap.add_argument("--chunksize", type=int, default=64, help="cases per worker task")
+    ap.add_argument("--legacy-match", action="store_true", help="use the old substring keyword matching")
+    ap.add_argument("--roadmap", help="also write the portfolio-wide combined roadmap to this path (.csv, .csv.gz, .parquet or .arrow)")
+    args = ap.parse_args(argv)
+
+    in_fmt = args.input_format or guess_format(args.input)
+    out_fmt = args.format or guess_format(args.output)
+
+    fin = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    roadmap = RoadmapAggregator() if args.roadmap else None
+    try:
+        results = run_batch(read_cases(fin, in_fmt), args.workers, args.chunksize, args.legacy_match, roadmap)
+        n = write_results(results, fout, out_fmt)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    if roadmap is not None:
+        write_roadmap(roadmap, args.roadmap)
+    print(f"Scored {n} cases.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import catalog
+import engine
+import exports
+from ingest import iter_text_chunks, stream_signals
+from live import LiveCase
+from roadmap import RoadmapAggregator
+from sensitivity import case_inputs, simulate
+from service import ScoringService, load_test
+from startup import app_imports, profile_once
+
+# =============================================================
+# Agentic AI CEO — benchmark suite
+# -------------------------------------------------------------
+# Offline micro/macro benchmarks for the FMEA engine and roadmap
+# pipeline (no Streamlit involved). Text-bound stages run on
+# synthetic inputs from 100 B to 10 MB plus a corpus built from
+# the classic CASES; results go to JSON and can be compared with
+# a saved baseline.
+#
+#   python bench.py --save-baseline            # record bench_baseline.json
+#   python bench.py --baseline bench_baseline.json
+#   python bench.py --max-bytes 100000 -k "detect|roadmap"
+#
+# A benchmark regresses when its median is more than --threshold
+# (default 25%) slower than the baseline and the absolute slowdown
+# exceeds --noise-floor; any regression makes the exit code 1.
+# =============================================================
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_BASELINE = "bench_baseline.json"
+
+FILLER = (
+    "the board reviewed quarterly plan with teams across regions and noted open items for "
+    "follow up including timelines owners budgets dependencies and expected outcomes"
+).split()
+
+
+# -----------------------------
+# Inputs
+# -----------------------------
+
+def synthetic_text(n_bytes: int, seed: int = 0, density: float = 0.08) -> str:
+    """Deterministic board-pack-like text of ~n_bytes: filler words with ~density trigger/risk keywords."""
+    rng = random.Random(seed)
+    rules = catalog.current()
+    keywords = [t for spec in rules.themes.values() for t in spec["triggers"]] + list(rules.risky_keywords)
+    words: List[str] = []
+    size = 0
+    while size < n_bytes:
+        w = rng.choice(keywords) if rng.random() < density else rng.choice(FILLER)
+        if rng.random() < 0.06:
+            w += rng.choice([".", ",", ";", "\n"])
+        words.append(w)
+        size += len(w) + 1
+    return " ".join(words)[:n_bytes]
+
+
+def cases_corpus() -> List[Tuple[str, str]]:
+    """Every classic case problem paired with every other case's text as the decision."""
+    texts = list(engine.CASES.values())
+    return [(p, d) for p in texts for d in texts if p is not d]
+
+
+def live_edit(problem: str, decision: str, words: int = 100) -> Callable[[], Dict]:
+    """A LiveCase over problem split into ~words-word paragraphs; each call toggles an edit of the middle one."""
+    tokens = problem.split(" ")
+    paras = [" ".join(tokens[i:i + words]) for i in range(0, len(tokens), words)]
+    mid = len(paras) // 2
+    edited = paras[:mid] + [paras[mid] + " data breach"] + paras[mid + 1:]
+    versions = ["\n\n".join(paras), "\n\n".join(edited)]
+    live = LiveCase()
+    live.update(versions[0], decision)
+    turn = [0]
+
+    def edit() -> Dict:
+        turn[0] ^= 1
+        return live.update(versions[turn[0]], decision)
+
+    return edit
+
+
+def human_size(n: int) -> str:
+    for unit, div in (("MB", 1_000_000), ("kB", 1_000)):
+        if n >= div:
+            return f"{n // div}{unit}"
+    return f"{n}B"
+
+
+# -----------------------------
+# Timing
+# -----------------------------
+
+def measure(fn: Callable[[], object], min_time: float = 0.2, max_repeats: int = 50, min_repeats: int = 3) -> Dict:
+    """Run fn repeatedly (at least min_repeats, until min_time has elapsed) and summarize."""
+    times: List[float] = []
+    total = 0.0
+    while len(times) < min_repeats or (total < min_time and len(times) < max_repeats):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        times.append(dt)
+        total += dt
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "repeats": len(times),
+    }
+
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+
+Bench = Tuple[str, Callable[[], object], Dict]
+
+
+def text_benchmarks(max_bytes: int) -> Iterator[Bench]:
+    decision = "We will pivot via an acquisition, move to the cloud and review compliance."
+    for n in [s for s in SIZES if s <= max_bytes]:
+        problem = synthetic_text(n, seed=n)
+        tag = human_size(n)
+        meta = {"bytes": n}
+        yield f"tokenize[{tag}]", lambda p=problem: engine.tokenize(p), meta
+        yield f"detect_themes[{tag}]", lambda p=problem: engine.detect_themes(p, decision), meta
+        yield f"detect_themes_legacy[{tag}]", lambda p=problem: engine.detect_themes(p, decision, legacy=True), meta
+        yield f"base_scores[{tag}]", lambda p=problem: engine.base_scores(p, decision), meta
+        yield f"case_signals[{tag}]", lambda p=problem: engine.case_signals(p, decision), meta
+        yield f"stream_signals[{tag}]", lambda p=problem: stream_signals(iter_text_chunks(io.StringIO(p)), decision), meta
+        yield f"live_edit[{tag}, 1 paragraph]", live_edit(problem, decision), meta
+
+
+def scoring_benchmarks() -> Iterator[Bench]:
+    leaders = list(catalog.current().leader_names)
+    rng = np.random.default_rng(0)
+    base_1m = rng.integers(1, 11, size=(100_000, 3))
+
+    def scalar_styles():
+        for leader in leaders:
+            engine.style_adjusted_scores(6, 5, 5, leader)
+
+    yield "style_adjusted_scores[10 leaders]", scalar_styles, {}
+    yield "score_matrix[100k cases x 10]", lambda: engine.score_matrix(base_1m), {"pairs": base_1m.shape[0] * len(leaders)}
+
+    problem, decision = next(iter(engine.CASES.values())), "We will pivot via an acquisition and layoffs."
+    theme_scores, base = engine.case_signals(problem, decision)
+    sod = engine.score_matrix([base])[0][0].tolist()
+    top = engine.rank_themes(theme_scores)
+
+    def mitigations():
+        for leader, (s, o, d) in zip(leaders, sod):
+            engine.build_mitigations(problem, decision, leader, s, o, d, theme_scores, top)
+
+    yield "build_mitigations[10 leaders]", mitigations, {}
+
+    inputs = case_inputs(problem, decision)
+    yield "sensitivity_simulate[200k samples]", lambda: simulate(inputs, samples=200_000), {"samples": 200_000}
+
+
+def pipeline_benchmarks() -> Iterator[Bench]:
+    corpus = cases_corpus()
+    yield f"case_results[CASES corpus x{len(corpus)}]", lambda: engine.case_results(corpus), {"cases": len(corpus)}
+
+    results = engine.case_results(corpus)
+    one = results[0]
+    actions = one["actions"]
+    all_actions = [a for r in results for a in r["actions"]]
+    partials = [r["roadmap"] for r in results]
+
+    yield "roadmap_aggregate[1 case]", lambda: RoadmapAggregator(actions), {"actions": len(actions)}
+    yield f"roadmap_aggregate[{len(corpus)} cases]", lambda: RoadmapAggregator(all_actions), {"actions": len(all_actions)}
+
+    def merge_partials():
+        agg = RoadmapAggregator()
+        for p in partials:
+            agg.merge(p)
+        return agg
+
+    yield f"roadmap_merge[{len(partials)} partials]", merge_partials, {}
+    yield "roadmap_to_frame[1 case]", lambda: one["roadmap"].to_frame(), {}
+
+    # exports: the three downloads the UI offers
+    problem, decision = corpus[0]
+    payload = engine.results_payload(problem, decision, one)
+    yield "export_fmea_csv", lambda: exports.fmea_csv(one), {}
+    yield "export_roadmap_csv", lambda: exports.roadmap_csv(one), {}
+    yield "export_results_json", lambda: exports.results_json(payload), {}
+
+    # portfolio roadmap (all cases merged) in each export format
+    portfolio = merge_partials()
+    for fmt in exports.roadmap_formats():
+        yield f"export_roadmap[{fmt}, {len(portfolio)} rows]", lambda fmt=fmt: exports.roadmap_bytes(portfolio, fmt), {"rows": len(portfolio)}
+
+
+def large_tables(n_triggers: int) -> Dict[str, Dict]:
+    """The default rule tables plus synthetic two-word triggers spread over the themes (~n_triggers in all)."""
+    rules = catalog.current()
+    themes = {name: {**spec, "triggers": list(spec["triggers"])} for name, spec in rules.themes.items()}
+    names = list(themes)
+    extra = n_triggers - sum(len(spec["triggers"]) for spec in themes.values())
+    for i in range(max(extra, 0)):
+        themes[names[i % len(names)]]["triggers"].append(f"term{i} variant{i % 97}")
+    return {
+        "leader_styles": rules.leader_styles,
+        "style_biases": rules.style_biases,
+        "style_guardrails": rules.style_guardrails,
+        "themes": themes,
+        "risky_keywords": rules.risky_keywords,
+    }
+
+
+def catalog_benchmarks() -> Iterator[Bench]:
+    rules = catalog.current()
+    files = catalog.source_files(catalog.RULES_PATH)
+    fp = catalog.fingerprint(files)
+    yield "catalog_compile[default]", lambda: catalog.RuleCatalog(catalog.read_tables(files), files, fp), {}
+
+    index = os.path.join(tempfile.gettempdir(), "bench_rules_index.pickle")
+    catalog.save_index(rules, index)
+    yield "catalog_index_load[default]", lambda: catalog.load_index(index, rules.fingerprint), {}
+
+    # scan cost vs catalog size: token matching should not grow with the number of triggers
+    tables = large_tables(10_000)
+    big = catalog.RuleCatalog(tables)
+    n_big = big.stats()["triggers"]
+    yield f"catalog_compile[{n_big} triggers]", lambda: catalog.RuleCatalog(tables), {"triggers": n_big}
+    text = synthetic_text(100_000)
+    for tag, candidate in (("default catalog", rules), (f"{n_big} triggers", big)):
+        meta = {"triggers": candidate.stats()["triggers"]}
+        yield f"case_signals[100 KB, {tag}]", lambda r=candidate: engine.case_signals(text, "", catalog=r), meta
+
+
+def service_benchmarks() -> Iterator[Bench]:
+    async def round_trips(n: int, connections: int) -> Dict:
+        service = ScoringService()
+        server = await service.start("127.0.0.1", 0)
+        async with server:
+            return await load_test(*server.sockets[0].getsockname()[:2], requests=n, connections=connections)
+
+    # localhost round trips over keep-alive connections, repeated input (cache hits after the first)
+    yield "service_score[2000 req x 8 conns]", lambda: asyncio.run(round_trips(2000, 8)), {"requests": 2000}
+
+
+def startup_benchmarks() -> Iterator[Bench]:
+    # a fresh interpreter importing what app.py imports at load (cold start)
+    modules = app_imports()
+    yield "startup_import[app modules]", lambda: profile_once(modules), {"modules": len(modules)}
+
+
+def all_benchmarks(max_bytes: int) -> Iterator[Bench]:
+    yield from text_benchmarks(max_bytes)
+    yield from scoring_benchmarks()
+    yield from catalog_benchmarks()
+    yield from pipeline_benchmarks()
+    yield from service_benchmarks()
+    yield from startup_benchmarks()
+
+
+# -----------------------------
+# Runner / baseline comparison
+# -----------------------------
+
+def run(max_bytes: int = SIZES[-1], pattern: Optional[str] = None, min_time: float = 0.2, verbose: bool = True) -> Dict:
+    rx = re.compile(pattern) if pattern else None
+    results: Dict[str, Dict] = {}
+    for name, fn, meta in all_benchmarks(max_bytes):
+        if rx and not rx.search(name):
+            continue
+        stats = measure(fn, min_time=min_time)
+        stats.update(meta)
+        results[name] = stats
+        if verbose:
+            print(f"{name:<42} {stats['median_s'] * 1e3:>11.3f} ms  (x{stats['repeats']})", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "catalog_version": catalog.current().version,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.25, noise_floor: float = 50e-6) -> List[Dict]:
+    """Per-benchmark ratio current/baseline (median); flags regressions beyond threshold."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        regressed = ratio > 1 + threshold and cur["median_s"] - base["median_s"] > noise_floor
+        rows.append({"name": name, "baseline_s": base["median_s"], "current_s": cur["median_s"], "ratio": ratio, "regressed": regressed})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the FMEA engine and roadmap pipeline (offline).")
+    ap.add_argument("-o", "--out", default="bench_results.json", help="where to write this run's results")
+    ap.add_argument("--baseline", help="baseline JSON to compare against")
+    ap.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help=f"also save results as baseline (default {DEFAULT_BASELINE})")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    ap.add_argument("--noise-floor", type=float, default=50e-6, help="ignore slowdowns smaller than this many seconds")
+    ap.add_argument("--max-bytes", type=int, default=SIZES[-1], help="largest synthetic text size")
+    ap.add_argument("--min-time", type=float, default=0.2, help="minimum measured seconds per benchmark")
+    ap.add_argument("-k", "--filter", help="regex; only run matching benchmarks")
+    args = ap.parse_args(argv)
+
+    report = run(args.max_bytes, args.filter, args.min_time)
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    rows = compare(report, baseline, args.threshold, args.noise_floor)
+    for r in rows:
+        flag = "REGRESSED" if r["regressed"] else ""
+        print(f"{r['name']:<42} {r['baseline_s'] * 1e3:>10.3f} -> {r['current_s'] * 1e3:>10.3f} ms  x{r['ratio']:.2f} {flag}")
+    regressions = [r for r in rows if r["regressed"]]
+    print(f"{len(rows)} compared, {len(regressions)} regressed (threshold {args.threshold:.0%}).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, BinaryIO, Callable, Dict, Hashable, Optional
+
+from archive import default_archive
+from catalog import RuleCatalog, current
+from engine import case_result
+from ingest import document_chunks, document_kind, document_result
+
+# =============================================================
+# Agentic AI CEO — result cache
+# -------------------------------------------------------------
+# Bounded LRU with TTL eviction, keyed by a hash of the normalized
+# case text + rule-catalog version. One instance lives per server
+# process, so every Streamlit session (and thread) shares it.
+# Behind it sits the persistent run archive (archive.py): misses
+# are looked up there before scoring, and every submission is
+# recorded (queued, written in the background).
+# =============================================================
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry time-to-live (seconds)."""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires = item
+            if expires is not None and expires <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            # computed outside the lock; concurrent misses may both compute, last write wins
+            value = fn()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def cache_key(problem: str, decision: str, legacy: bool = False, version: Optional[str] = None) -> str:
+    """Hash of everything the scores depend on (``version``: catalog version, default the active one).
+
+    The engine only ever sees f"{problem} {decision}".lower(), so that
+    string (not the raw inputs) is what gets hashed.
+    """
+    text = f"{problem} {decision}".lower()
+    h = hashlib.sha256()
+    h.update((version or current().version).encode())
+    h.update(b"\0legacy\0" if legacy else b"\0token\0")
+    h.update(text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+RESULT_CACHE = LRUCache(maxsize=512, ttl=6 * 3600)
+
+
+def archived(key: str, problem: str, decision: str, legacy: bool, compute: Callable[[], Dict], version: Optional[str] = None) -> Dict:
+    """RESULT_CACHE, then the run archive, then compute(); the submission is archived either way."""
+    archive = default_archive()
+    if archive is None:
+        return RESULT_CACHE.get_or_compute(key, compute)
+
+    def load() -> Dict:
+        result = archive.get(key)
+        return compute() if result is None else result
+
+    result = RESULT_CACHE.get_or_compute(key, load)
+    archive.record(key, problem, decision, result, legacy, version=version)
+    return result
+
+
+def cached_case_result(problem: str, decision: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Dict:
+    """engine.case_result() through the shared cache. Treat the returned dict as read-only.
+
+    Pass the caller's catalog snapshot (default: the active one) so a reload
+    cannot land between the key and the scoring.
+    """
+    catalog = catalog or current()
+    key = cache_key(problem, decision, legacy, catalog.version)
+    return archived(key, problem, decision, legacy, lambda: case_result(problem, decision, legacy, catalog), catalog.version)
+
+
+def document_cache_key(raw: BinaryIO, name: str, decision: str, legacy: bool = False, version: Optional[str] = None) -> str:
+    """Like cache_key(), for an uploaded problem document; the file is hashed in chunks and rewound."""
+    h = hashlib.sha256()
+    h.update((version or current().version).encode())
+    h.update(b"\0legacy\0" if legacy else b"\0token\0")
+    h.update(document_kind(name).encode())
+    raw.seek(0)
+    for block in iter(lambda: raw.read(1 << 20), b""):
+        h.update(block)
+    raw.seek(0)
+    h.update(b"\0")
+    h.update(decision.lower().encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def cached_document_result(raw: BinaryIO, name: str, decision: str, label: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Dict:
+    """ingest.document_result() through the shared cache. Treat the returned dict as read-only."""
+    catalog = catalog or current()
+    key = document_cache_key(raw, name, decision, legacy, catalog.version)
+    return archived(
+        key, label, decision, legacy,
+        lambda: document_result(document_chunks(raw, name), decision, label, legacy, catalog), catalog.version,
+    )
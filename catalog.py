@@ -0,0 +1,415 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from matcher import KeywordMatcher
+
+# =============================================================
+# Agentic AI CEO — rule catalog (data-driven, hot-reloadable)
+# -------------------------------------------------------------
+# Leader personas, style biases and guardrails, risk themes and
+# FMEA risk keywords live in JSON files (rules/ by default, or a
+# file/directory in $RULE_CATALOG). Every *.json file under the
+# directory is read in path order and merged section by section,
+# so e.g. rules/lang/de.json can add German triggers to existing
+# themes:
+#
+#   {"themes": {"Finance": {"triggers": ["umsatz", "marge"]}}}
+#
+# Sections: leader_styles, style_biases, style_guardrails,
+# themes (triggers/actions are appended), risky_keywords; other
+# sections merge by key (later files win). Top-level keys
+# starting with "_" are comments.
+#
+# The merged tables are compiled once into a RuleCatalog (keyword
+# matcher, leader bias matrix, rotated action lists, per-leader
+# guardrails) and pickled to an index (rules/.rules_index.pickle,
+# beside the rules and never in the working directory; $RULE_INDEX
+# overrides, "" disables) keyed by the source files' sizes and
+# mtimes, so later starts skip parsing and compiling.
+#
+# current() is the catalog in use. reload_if_changed() (cheap,
+# stats the files at most every $RULE_RELOAD_INTERVAL seconds)
+# compiles a changed catalog off to the side and swaps it in with
+# one assignment; a run that took a catalog keeps using it, and a
+# broken edit leaves the previous catalog active (last_error()).
+#
+#   python catalog.py                 # compile + write the index
+#   python catalog.py --rules my_rules/ --json
+# =============================================================
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RULES_PATH = os.environ.get("RULE_CATALOG") or os.path.join(HERE, "rules")
+INDEX_PATH = os.environ.get("RULE_INDEX")  # None: beside the rules (index_path_for); "": no index
+INDEX_NAME = ".rules_index.pickle"
+RELOAD_INTERVAL = float(os.environ.get("RULE_RELOAD_INTERVAL", 2.0))
+INDEX_FORMAT = 1  # bump when RuleCatalog / KeywordMatcher internals change
+
+SECTIONS = ("leader_styles", "style_biases", "style_guardrails", "themes", "risky_keywords")
+SOD = ("severity", "occurrence", "detection")
+
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+class CatalogError(ValueError):
+    pass
+
+
+# -----------------------------
+# Sources
+# -----------------------------
+
+def source_files(path: str) -> List[str]:
+    """The JSON files making up a catalog: ``path`` itself, or every *.json below it in path order."""
+    if os.path.isfile(path):
+        return [path]
+    if not os.path.isdir(path):
+        raise CatalogError(f"rule catalog not found: {path}")
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        files += [os.path.join(root, n) for n in names if n.endswith(".json") and not n.startswith(".")]
+    if not files:
+        raise CatalogError(f"no *.json rule files in {path}")
+    return sorted(files, key=lambda f: os.path.relpath(f, path))
+
+
+def fingerprint(files: Sequence[str]) -> Fingerprint:
+    out = []
+    for f in files:
+        st = os.stat(f)
+        out.append((os.path.abspath(f), st.st_size, st.st_mtime_ns))
+    return tuple(out)
+
+
+def _ints(value, n: int, where: str) -> Tuple[int, ...]:
+    if not isinstance(value, (list, tuple)) or len(value) != n or not all(isinstance(v, int) and not isinstance(v, bool) for v in value):
+        raise CatalogError(f"{where}: expected {n} integers, got {value!r}")
+    return tuple(value)
+
+
+def _str(value, where: str) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise CatalogError(f"{where}: expected a non-empty string, got {value!r}")
+    return value
+
+
+def merge_tables(docs: Sequence[Tuple[str, Dict]]) -> Dict[str, Dict]:
+    """Merge parsed rule files (in order) into the five catalog tables, validating as it goes."""
+    tables: Dict[str, Dict] = {name: {} for name in SECTIONS}
+    seen: Dict[str, set] = {}  # theme -> triggers and actions already listed
+    for source, doc in docs:
+        if not isinstance(doc, dict):
+            raise CatalogError(f"{source}: expected a JSON object")
+        for section, entries in doc.items():
+            if section.startswith("_"):
+                continue
+            if section not in tables:
+                raise CatalogError(f"{source}: unknown section {section!r} (expected one of {', '.join(SECTIONS)})")
+            if not isinstance(entries, dict):
+                raise CatalogError(f"{source}: {section} must be an object")
+            table = tables[section]
+            for key, value in entries.items():
+                where = f"{source}: {section}[{key!r}]"
+                if section in ("leader_styles", "style_guardrails"):
+                    table[key] = _str(value, where)
+                elif section == "style_biases":
+                    if not isinstance(value, dict) or set(value) != set(SOD):
+                        raise CatalogError(f"{where}: expected {{severity, occurrence, detection}}")
+                    table[key] = dict(zip(SOD, _ints([value[k] for k in SOD], 3, where)))
+                elif section == "risky_keywords":
+                    table[_str(key, where).lower()] = _ints(value, 3, where)
+                else:
+                    if not isinstance(value, dict) or not set(value) <= {"triggers", "actions"}:
+                        raise CatalogError(f"{where}: expected {{triggers, actions}}")
+                    theme = table.setdefault(key, {"triggers": [], "actions": []})
+                    known = seen.setdefault(key, set())
+                    for trig in value.get("triggers", []):
+                        trig = _str(trig, where).lower()
+                        if trig not in known:
+                            known.add(trig)
+                            theme["triggers"].append(trig)
+                    for act in value.get("actions", []):
+                        if not isinstance(act, dict) or set(act) != {"action", "owner", "kpi"}:
+                            raise CatalogError(f"{where}: actions need action, owner and kpi")
+                        act = {k: _str(act[k], where) for k in ("action", "owner", "kpi")}
+                        ident = (act["action"], act["owner"], act["kpi"])
+                        if ident not in known:
+                            known.add(ident)
+                            theme["actions"].append(act)
+    if not tables["leader_styles"]:
+        raise CatalogError("the catalog defines no leaders (leader_styles)")
+    if not tables["themes"]:
+        raise CatalogError("the catalog defines no themes")
+    for theme, spec in tables["themes"].items():
+        if not spec["actions"]:
+            raise CatalogError(f"theme {theme!r} has no actions")
+    return tables
+
+
+def read_tables(files: Sequence[str]) -> Dict[str, Dict]:
+    docs = []
+    for f in files:
+        with open(f, encoding="utf-8") as fh:
+            try:
+                docs.append((f, json.load(fh)))
+            except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                raise CatalogError(f"{f}: {exc}") from None
+    return merge_tables(docs)
+
+
+def tables_version(tables: Dict[str, Dict]) -> str:
+    """Short content hash of the rule tables; part of every cache key."""
+    ordered = [tables["leader_styles"], tables["style_biases"], tables["themes"], tables["style_guardrails"], tables["risky_keywords"]]
+    blob = json.dumps(ordered, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha1(blob).hexdigest()[:12]
+
+
+# -----------------------------
+# Compiled catalog
+# -----------------------------
+# The per-theme action rotation uses crc32, which (unlike the salted
+# builtin hash()) is the same in every process, and all strings are
+# interned so records are shared by every case a worker scores.
+
+def _rotation(theme: str, size: int) -> int:
+    return zlib.crc32(theme.encode("utf-8")) % size
+
+
+def action_record(theme: str, action: str, owner: str, kpi: str) -> Dict[str, str]:
+    return {"Theme": sys.intern(theme), "Action": sys.intern(action), "Owner": sys.intern(owner), "KPI": sys.intern(kpi)}
+
+
+class RuleCatalog:
+    """One immutable, compiled version of the rule tables. Do not mutate; compile a new one."""
+
+    def __init__(self, tables: Dict[str, Dict], sources: Sequence[str] = (), fingerprint: Fingerprint = ()):
+        self.leader_styles: Dict[str, str] = tables["leader_styles"]
+        self.style_biases: Dict[str, Dict[str, int]] = tables["style_biases"]
+        self.style_guardrails: Dict[str, str] = tables["style_guardrails"]
+        self.themes: Dict[str, Dict] = tables["themes"]
+        self.risky_keywords: Dict[str, Tuple[int, int, int]] = tables["risky_keywords"]
+        self.version = tables_version(tables)
+        self.sources = list(sources)
+        self.fingerprint = fingerprint
+
+        self.matcher = KeywordMatcher(self.themes, self.risky_keywords)
+        # theme -> its action records, already rotated (see engine.pick_actions_for_theme)
+        self.action_catalog: Dict[str, Tuple[Dict[str, str], ...]] = {}
+        for theme, spec in self.themes.items():
+            lib = spec["actions"]
+            idx = _rotation(theme, len(lib))
+            self.action_catalog[theme] = tuple(action_record(theme, a["action"], a["owner"], a["kpi"]) for a in lib[idx:] + lib[:idx])
+        # per leader, precomputed: (L, 3) S/O/D biases and guardrails
+        self.leader_names: List[str] = list(self.leader_styles)
+        self.leader_bias = np.array([self.style_bias(leader) for leader in self.leader_names], dtype=np.int32).reshape(-1, 3)
+        self.leader_bias.setflags(write=False)
+        self.guardrails = {leader: self._guardrail(leader) for leader in self.leader_names}
+
+    def style_bias(self, leader: str) -> Tuple[int, int, int]:
+        """S/O/D bias of the first style_biases key found in the leader name (0s if none)."""
+        bias = next((b for key, b in self.style_biases.items() if key in leader), None)
+        return (bias["severity"], bias["occurrence"], bias["detection"]) if bias else (0, 0, 0)
+
+    def _guardrail(self, leader: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        key = next((k for k in self.style_guardrails if k in leader), None)
+        if key is None:
+            return None
+        return key, action_record("Governance", self.style_guardrails[key], "CEO/PMO", "Decision latency / risk review cadence")
+
+    def guardrail_for(self, leader: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """(style key, guardrail record) for the first style_guardrails key found in the leader name."""
+        if leader in self.guardrails:
+            return self.guardrails[leader]
+        return self._guardrail(leader)
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.version,
+            "leaders": len(self.leader_styles),
+            "themes": len(self.themes),
+            "triggers": sum(len(s["triggers"]) for s in self.themes.values()),
+            "actions": sum(len(s["actions"]) for s in self.themes.values()),
+            "risky_keywords": len(self.risky_keywords),
+            "sources": self.sources,
+        }
+
+
+# -----------------------------
+# Index (pickled compiled catalog)
+# -----------------------------
+
+def save_index(catalog: RuleCatalog, path: str) -> None:
+    """Write the compiled catalog atomically (best effort: an unwritable index only costs startup time)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            pickle.dump({"format": INDEX_FORMAT, "fingerprint": catalog.fingerprint, "catalog": catalog}, fh, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def load_index(path: str, fp: Fingerprint) -> Optional[RuleCatalog]:
+    """The indexed catalog if it was compiled from exactly these source files, else None.
+
+    The index is a pickle: only point $RULE_INDEX at files this app wrote.
+    """
+    try:
+        with open(path, "rb") as fh:
+            data = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != INDEX_FORMAT or data.get("fingerprint") != fp:
+        return None
+    return data["catalog"]
+
+
+def index_path_for(path: str) -> str:
+    """Default index location, owned by the rules rather than the working directory:
+    <dir>/.rules_index.pickle for a rules directory, <file>.index.pickle for a single file."""
+    if os.path.isdir(path):
+        return os.path.join(path, INDEX_NAME)
+    return f"{path}.index.pickle"
+
+
+def load_catalog(path: str = RULES_PATH, index_path: Optional[str] = INDEX_PATH) -> RuleCatalog:
+    """Compiled catalog for the rule files at ``path``, from the index when it is current.
+
+    ``index_path`` None means index_path_for(path); "" compiles without an index.
+    """
+    files = source_files(path)
+    if index_path is None:
+        index_path = index_path_for(path)
+    fp = fingerprint(files)
+    if index_path:
+        catalog = load_index(index_path, fp)
+        if catalog is not None:
+            return catalog
+    catalog = RuleCatalog(read_tables(files), files, fp)
+    if index_path:
+        save_index(catalog, index_path)
+    return catalog
+
+
+# -----------------------------
+# Active catalog + hot reload
+# -----------------------------
+
+_CURRENT: Optional[RuleCatalog] = None
+_PATH = RULES_PATH
+_LOCK = threading.Lock()
+_checked = 0.0
+_failed: Optional[Fingerprint] = None
+_error: Optional[str] = None
+
+
+def current() -> RuleCatalog:
+    """The active catalog (loaded on first use). Take it once per run and pass it along."""
+    global _checked
+    catalog = _CURRENT
+    if catalog is None:
+        with _LOCK:
+            if _CURRENT is None:
+                _activate(load_catalog(_PATH))
+                _checked = time.monotonic()
+            catalog = _CURRENT
+    return catalog
+
+
+def _activate(catalog: RuleCatalog) -> None:
+    global _CURRENT, _error, _failed
+    _CURRENT = catalog
+    _error = _failed = None
+
+
+def use(path: str, index_path: Optional[str] = INDEX_PATH) -> RuleCatalog:
+    """Switch to the catalog at ``path`` (and watch it from now on)."""
+    global _PATH
+    catalog = load_catalog(path, index_path)
+    with _LOCK:
+        _PATH = path
+        _activate(catalog)
+    return catalog
+
+
+def reload_if_changed(force: bool = False, index_path: Optional[str] = INDEX_PATH) -> bool:
+    """Swap in a freshly compiled catalog if the rule files changed; True if it did.
+
+    Checks at most every RELOAD_INTERVAL seconds unless ``force``. A catalog
+    that fails to load is reported by last_error() and not retried until the
+    files change again.
+    """
+    global _checked, _failed, _error
+    catalog = current()
+    now = time.monotonic()
+    if not force and now - _checked < RELOAD_INTERVAL:
+        return False
+    _checked = now
+    try:
+        fp = fingerprint(source_files(_PATH))
+    except (OSError, CatalogError) as exc:
+        _error = str(exc)
+        return False
+    if fp == catalog.fingerprint or fp == _failed:
+        return False
+    with _LOCK:
+        if _CURRENT is not None and _CURRENT.fingerprint == fp:
+            return False
+        try:
+            fresh = load_catalog(_PATH, index_path)
+        except (OSError, CatalogError) as exc:
+            _failed, _error = fp, str(exc)
+            return False
+        _activate(fresh)
+    return True
+
+
+def last_error() -> Optional[str]:
+    """Why the latest reload attempt failed (the previous catalog stays active), or None."""
+    return _error
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Validate and compile the rule catalog into its index.")
+    ap.add_argument("--rules", default=RULES_PATH, help="rule file or directory (default: $RULE_CATALOG or rules/)")
+    ap.add_argument("--index", default=INDEX_PATH, help="index file to write (default: beside the rules; '' to only validate)")
+    ap.add_argument("--json", action="store_true", help="print catalog stats as JSON")
+    args = ap.parse_args(argv)
+    if args.index is None:
+        args.index = index_path_for(args.rules)
+
+    try:
+        files = source_files(args.rules)
+        t0 = time.perf_counter()
+        catalog = RuleCatalog(read_tables(files), files, fingerprint(files))
+        compile_ms = (time.perf_counter() - t0) * 1e3
+    except (OSError, CatalogError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    if args.index:
+        save_index(catalog, args.index)
+    stats = {**catalog.stats(), "compile_ms": round(compile_ms, 2), "index": args.index or None}
+    if args.json:
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+    else:
+        print(f"catalog {stats['version']}: {stats['leaders']} leaders, {stats['themes']} themes, "
+              f"{stats['triggers']} triggers, {stats['risky_keywords']} risk keywords "
+              f"from {len(files)} file(s); compiled in {compile_ms:.1f} ms" + (f" -> {args.index}" if args.index else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from catalog import RuleCatalog, current
+from matcher import SEPARATOR_TABLE, TOKEN_SEPARATORS, tokenize  # noqa: F401 (re-exported)
+from profiling import stage
+from roadmap import RoadmapAggregator
+
+if TYPE_CHECKING:  # pandas is only imported when a DataFrame is built
+    import pandas as pd
+
+# =============================================================
+# Agentic AI CEO — FMEA engine (importable, UI-free)
+# -------------------------------------------------------------
+# Scoring functions shared by the Streamlit page (app.py) and the
+# headless batch runner (batch.py). Nothing in here touches
+# Streamlit, so it can run inside worker processes.
+#
+# The rule tables (leaders, biases, themes, risk keywords) are
+# data in rules/*.json, compiled by catalog.py. Functions take an
+# optional ``catalog``; entry points resolve catalog.current()
+# once and pass it down, so a hot reload never mixes two catalogs
+# within one run.
+# =============================================================
+
+# -----------------------------
+# Classic cases to prefill
+# -----------------------------
+CASES = {
+    "Nokia": "Failed to adapt from feature phones to smartphone OS ecosystems (iOS/Android).",
+    "Kodak": "Underestimated the shift to digital photography despite inventing it internally.",
+    "Blockbuster": "Ignored/late to video streaming disruption and online subscription models.",
+    "Sears": "Lost retail share to e-commerce and discounters due to slow digital pivot.",
+    "Pan Am": "High fixed costs, deregulation shocks, and financial mismanagement led to collapse.",
+    "Suzuki (hypothetical)": "Should Suzuki Motor Corporation go into the food business?"
+}
+
+# -----------------------------
+# Small utilities
+# -----------------------------
+
+def clamp(x: int, lo: int = 1, hi: int = 10) -> int:
+    return max(lo, min(hi, int(round(x))))
+
+
+def case_signals(problem: str, decision: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Tuple[Dict[str, float], Tuple[int, int, int]]:
+    """Return (theme scores, base S/O/D) from a single scan of problem+decision.
+
+    Keywords match whole tokens; legacy=True reproduces the original
+    substring matching (where e.g. "ai" also fires inside "said").
+    """
+    catalog = catalog or current()
+    text = f"{problem} {decision}".lower()
+    with stage("engine.tokenize"):
+        tokens = tokenize(text)
+    with stage("engine.match"):
+        if legacy:
+            hits, deltas = catalog.matcher.scan_legacy(text)
+        else:
+            hits, deltas = catalog.matcher.scan(tokens)
+    return signals_from_counts(hits, deltas, len(tokens), len(text), catalog)
+
+
+def signals_from_counts(hits: Sequence[int], deltas: Tuple[int, int, int], n_tokens: int, n_chars: int, catalog: Optional[RuleCatalog] = None) -> Tuple[Dict[str, float], Tuple[int, int, int]]:
+    """(theme scores, base S/O/D) from matcher totals plus token/char counts of the case text.
+
+    Split out of case_signals so streamed documents (ingest.py) can feed
+    incrementally accumulated counts into the same formulas.
+    """
+    # Themes: score = hits + small complexity bonus
+    length_bonus = min(n_tokens / 200.0, 3.0)
+    theme_names = (catalog or current()).matcher.theme_names
+    scores: Dict[str, float] = {theme: h + length_bonus for theme, h in zip(theme_names, hits)}
+    # guarantee some mass even when no keywords match
+    if sum(scores.values()) == 0:
+        for k in scores:
+            scores[k] = 0.5
+
+    sev, occ, det = raw_base(deltas, n_chars)
+    return scores, (clamp(sev), clamp(occ), clamp(det))
+
+
+def raw_base(deltas: Tuple[int, int, int], n_chars: int) -> Tuple[int, int, int]:
+    """Unclamped base S/O/D: fixed 6/5/5 + keyword deltas + length factor."""
+    ds, do, dd = deltas
+    sev, occ, det = 6 + ds, 5 + do, 5 + dd
+    length_factor = min(n_chars // 200, 3)
+    sev += length_factor; occ += length_factor
+    return sev, occ, det
+
+
+def detect_themes(problem: str, decision: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Dict[str, float]:
+    """Return weighted theme scores based on keyword hits in problem+decision text."""
+    return case_signals(problem, decision, legacy, catalog)[0]
+
+
+def base_scores(problem: str, decision: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Tuple[int, int, int]:
+    return case_signals(problem, decision, legacy, catalog)[1]
+
+
+def style_adjusted_scores(sev: int, occ: int, det: int, leader_name: str, catalog: Optional[RuleCatalog] = None) -> Tuple[int, int, int]:
+    ds, do, dd = (catalog or current()).style_bias(leader_name)
+    return clamp(sev + ds), clamp(occ + do), clamp(det + dd)
+
+
+def rpn_bucket(rpn: int) -> str:
+    if rpn >= 180:
+        return "0–30d"
+    if rpn >= 120:
+        return "30–60d"
+    return "60–90d"
+
+
+# -----------------------------
+# Vectorized scoring (cases × leaders)
+# -----------------------------
+# Same arithmetic as style_adjusted_scores + rpn_bucket, broadcast
+# over an (N, 3) block of base S/O/D and the (L, 3) leader biases
+# (RuleCatalog.leader_bias).
+
+BUCKET_LABELS = np.array(["0–30d", "30–60d", "60–90d"])
+
+
+def score_matrix(base, bias: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score N cases against L leaders in one shot.
+
+    Returns (sod (N, L, 3), rpn (N, L), bucket (N, L)) where bucket indexes
+    BUCKET_LABELS. Clamping rounds half-to-even like clamp().
+    """
+    if bias is None:
+        bias = current().leader_bias
+    base = np.asarray(base).reshape(-1, 3)
+    if not np.issubdtype(base.dtype, np.integer):
+        base = np.rint(base)
+    base = np.clip(base, 1, 10).astype(np.int32)
+    sod = np.clip(base[:, None, :] + bias[None, :, :], 1, 10)
+    rpn = sod[..., 0] * sod[..., 1] * sod[..., 2]
+    bucket = (rpn < 180).astype(np.int8) + (rpn < 120)
+    return sod, rpn, bucket
+
+
+# -----------------------------
+# Mitigations
+# -----------------------------
+
+def pick_actions_for_theme(theme: str, n: int = 2, catalog: Optional[RuleCatalog] = None) -> Tuple[Dict[str, str], ...]:
+    # rotate to avoid duplicates when many agents pick same theme
+    # (deterministic shuffle by theme crc32, precomputed in RuleCatalog.action_catalog)
+    return (catalog or current()).action_catalog[theme][:n]
+
+
+def rank_themes(theme_scores: Dict[str, float], k: int = 3) -> List[str]:
+    """Top-k themes by text score.
+
+    build_mitigations weighs themes by score * (sev + occ); the multiplier is
+    positive and the same for every theme, so this ranking holds for all
+    leaders and only needs computing once per case.
+    """
+    ranked = sorted(theme_scores.items(), key=lambda x: x[1], reverse=True)
+    return [t for t, _ in ranked[:k]]
+
+
+@lru_cache(maxsize=None)
+def _theme_why(theme: str, sev: int, occ: int, det: int) -> str:
+    return f"Elevated {theme} risk signaled by text and S={sev}, O={occ}, D={det}"
+
+
+@lru_cache(maxsize=None)
+def _guardrail_why(key: str) -> str:
+    return f"Style-specific guardrail for {key} leadership."
+
+
+def build_mitigations(
+    problem: str,
+    decision: str,
+    leader: str,
+    sev: int,
+    occ: int,
+    det: int,
+    theme_scores: Dict[str, float],
+    top_themes: Optional[List[str]] = None,
+    catalog: Optional[RuleCatalog] = None,
+):
+    """Return a list of mitigation action dicts tailored to text + scores.
+
+    Pass ``top_themes`` (from rank_themes) to reuse one ranking across leaders.
+    """
+    catalog = catalog or current()
+    rpn = sev * occ * det
+    start_by = rpn_bucket(rpn)
+    if top_themes is None:
+        top_themes = rank_themes(theme_scores)
+
+    actions = []
+    for theme in top_themes:
+        why = _theme_why(theme, sev, occ, det)
+        for rec in pick_actions_for_theme(theme, 2, catalog):
+            actions.append({"Leader": leader, **rec, "StartBy": start_by, "Why": why, "RPN": rpn})
+    # add one style-specific guardrail per leader
+    guard = catalog.guardrail_for(leader)
+    if guard is not None:
+        key, rec = guard
+        actions.append({"Leader": leader, **rec, "StartBy": start_by, "Why": _guardrail_why(key), "RPN": rpn})
+    return actions
+
+
+# -----------------------------
+# Whole-case pipeline
+# -----------------------------
+
+def roadmap_frame(all_actions: List[Dict]) -> "pd.DataFrame":
+    """Aggregate actions by (Action, Owner, Theme, KPI, StartBy) into a risk-weighted roadmap."""
+    # weight = sum of contributing RPNs (higher -> earlier priority)
+    return RoadmapAggregator(all_actions).to_frame()
+
+
+def score_leaders(
+    problem: str,
+    decision: str,
+    theme_scores: Dict[str, float],
+    sod: Sequence[Sequence[int]],
+    roadmap: Optional[RoadmapAggregator] = None,
+    catalog: Optional[RuleCatalog] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """Build FMEA rows and mitigations for one case from its (L, 3) slice of score_matrix().
+
+    Actions are also folded into ``roadmap`` as they are produced, if given.
+    """
+    catalog = catalog or current()
+    results_rows: List[Dict] = []
+    all_actions: List[Dict] = []
+    with stage("engine.mitigations"):
+        top_themes = rank_themes(theme_scores)  # shared by every leader
+        for leader, (sev, occ, det) in zip(catalog.leader_names, sod):
+            rpn = sev * occ * det
+            all_actions.extend(build_mitigations(problem, decision, leader, sev, occ, det, theme_scores, top_themes, catalog))
+            results_rows.append({
+                "Leader": leader,
+                "Severity": sev,
+                "Occurrence": occ,
+                "Detection": det,
+                "RPN": rpn,
+            })
+    if roadmap is not None:
+        with stage("engine.roadmap"):
+            roadmap.extend(all_actions)
+    return results_rows, all_actions
+
+
+def case_results(cases: Sequence[Tuple[str, str]], legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> List[Dict]:
+    """Engine run for many (problem, decision) pairs; leader scoring is one vectorized call.
+
+    Each result holds theme_scores, fmea (rows in leader order),
+    actions (every leader's mitigations) and roadmap (a RoadmapAggregator;
+    call .to_frame() for display, .records() for export).
+    """
+    catalog = catalog or current()
+    return results_from_signals(cases, [case_signals(problem, decision, legacy, catalog) for problem, decision in cases], catalog)
+
+
+def results_from_signals(
+    cases: Sequence[Tuple[str, str]],
+    signals: Sequence[Tuple[Dict[str, float], Tuple[int, int, int]]],
+    catalog: Optional[RuleCatalog] = None,
+) -> List[Dict]:
+    """case_results() for already computed (theme scores, base S/O/D) signals (from the same catalog)."""
+    catalog = catalog or current()
+    with stage("engine.score_matrix"):
+        sod, _, _ = score_matrix([base for _, base in signals], catalog.leader_bias)
+    out = []
+    for (problem, decision), (theme_scores, _), case_sod in zip(cases, signals, sod.tolist()):
+        roadmap = RoadmapAggregator()
+        results_rows, all_actions = score_leaders(problem, decision, theme_scores, case_sod, roadmap, catalog)
+        out.append({
+            "theme_scores": theme_scores,
+            "fmea": results_rows,
+            "actions": all_actions,
+            "roadmap": roadmap,
+        })
+    return out
+
+
+def case_result(problem: str, decision: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Dict:
+    return case_results([(problem, decision)], legacy, catalog)[0]
+
+
+def results_payload(problem: str, decision: str, result: Dict) -> Dict:
+    """The "Download Full Results (JSON)" payload for one case result."""
+    return {
+        "problem": problem,
+        "decision": decision,
+        "theme_scores": result["theme_scores"],
+        "fmea": result["fmea"],
+        "actions": result["roadmap"].records(),
+    }
+
+
+def analyze_cases(cases: Sequence[Tuple[str, str]], legacy: bool = False) -> List[Dict]:
+    """Full-results payloads for many (problem, decision) pairs."""
+    return [results_payload(p, d, r) for (p, d), r in zip(cases, case_results(cases, legacy))]
+
+
+def analyze_case(problem: str, decision: str, legacy: bool = False) -> Dict:
+    """Full engine run for one case, shaped like the UI's "Download Full Results (JSON)" payload."""
+    return analyze_cases([(problem, decision)], legacy)[0]
@@ -0,0 +1,216 @@
+import csv
+import importlib.util
+import io
+import json
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from roadmap import ROADMAP_COLUMNS
+
+# =============================================================
+# Agentic AI CEO — downloads without pandas
+# -------------------------------------------------------------
+# The UI's downloads (and batch.py's portfolio roadmap), built
+# from the plain result records with the csv/json modules, so no
+# download needs pandas. The CSV bytes match
+# DataFrame.to_csv(index=False) for the same rows (FMEA rows with
+# equal RPN keep leader order); the JSON export no longer goes
+# through pd.io.json.dumps, gone from current pandas.
+#
+# Every format is a generator of byte chunks (iter_*), so large
+# roadmaps can be written or compressed piece by piece instead of
+# being held as one string; the UI only calls them when a download
+# button is clicked. Roadmaps can also be exported gzip-compressed
+# or as Parquet / Arrow IPC (those two need pyarrow, which is
+# imported only when used).
+# =============================================================
+
+FMEA_COLUMNS = ["Leader", "Severity", "Occurrence", "Detection", "RPN"]
+INT_COLUMNS = {"Severity", "Occurrence", "Detection", "RPN", "Weight"}  # the rest are strings
+CHUNK_ROWS = 1000
+CHUNK_BYTES = 1 << 16
+
+Chunks = Iterator[bytes]
+
+
+def fmea_rows(result: Dict) -> List[Dict]:
+    """Summary rows, highest RPN first (ties keep leader order)."""
+    return sorted(result["fmea"], key=lambda r: r["RPN"], reverse=True)
+
+
+def join(chunks: Iterable[bytes]) -> bytes:
+    return b"".join(chunks)
+
+
+# -----------------------------
+# Text formats
+# -----------------------------
+
+def iter_records_csv(records: Iterable[Dict], columns: Sequence[str], chunk_rows: int = CHUNK_ROWS) -> Chunks:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=columns, lineterminator="\n", extrasaction="ignore")
+    writer.writeheader()
+    n = 0
+    for record in records:
+        writer.writerow(record)
+        n += 1
+        if n == chunk_rows:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+            n = 0
+    if out.tell():
+        yield out.getvalue().encode()
+
+
+def records_csv(records: Sequence[Dict], columns: Sequence[str]) -> bytes:
+    return join(iter_records_csv(records, columns))
+
+
+def fmea_csv(result: Dict) -> bytes:
+    return records_csv(fmea_rows(result), FMEA_COLUMNS)
+
+
+def roadmap_csv(result: Dict) -> bytes:
+    return records_csv(result["roadmap"].records(), ROADMAP_COLUMNS)
+
+
+def iter_json(payload: Dict, indent: int = 2, chunk_bytes: int = CHUNK_BYTES) -> Chunks:
+    """json.dumps(payload, indent=indent) in ~chunk_bytes pieces."""
+    parts: List[str] = []
+    size = 0
+    for piece in json.JSONEncoder(indent=indent).iterencode(payload):
+        parts.append(piece)
+        size += len(piece)
+        if size >= chunk_bytes:
+            yield "".join(parts).encode()
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts).encode()
+
+
+def results_json(payload: Dict) -> bytes:
+    return join(iter_json(payload))
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Chunks:
+    """gzip-compress a chunk stream (no timestamp in the header, so output is reproducible)."""
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = comp.compress(chunk)
+        if out:
+            yield out
+    yield comp.flush()
+
+
+# -----------------------------
+# Binary formats (pyarrow)
+# -----------------------------
+
+def binary_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file object collecting what a pyarrow writer emits, drained between batches."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def arrow_schema(columns: Sequence[str]):
+    """Fixed column types, so every batch (and an empty export) has the same schema."""
+    import pyarrow as pa
+
+    return pa.schema([(c, pa.int64() if c in INT_COLUMNS else pa.string()) for c in columns])
+
+
+def _record_batches(records: Iterable[Dict], schema, chunk_rows: int):
+    import pyarrow as pa
+
+    buf: List[Dict] = []
+    for record in records:
+        buf.append(record)
+        if len(buf) == chunk_rows:
+            yield pa.RecordBatch.from_pylist(buf, schema=schema)
+            buf = []
+    if buf:
+        yield pa.RecordBatch.from_pylist(buf, schema=schema)
+
+
+def _iter_binary(records: Iterable[Dict], columns: Sequence[str], open_writer: Callable, chunk_rows: int) -> Chunks:
+    # the writer opens before the first record, so no records still make a valid (empty) file
+    schema = arrow_schema(columns)
+    sink = _Sink()
+    writer = open_writer(sink, schema)
+    for batch in _record_batches(records, schema, chunk_rows):
+        writer.write_batch(batch)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def iter_parquet(records: Iterable[Dict], columns: Sequence[str], chunk_rows: int = CHUNK_ROWS * 10) -> Chunks:
+    """Parquet (zstd), one row group per chunk_rows records."""
+    import pyarrow.parquet as pq
+
+    return _iter_binary(records, columns, lambda sink, schema: pq.ParquetWriter(sink, schema, compression="zstd"), chunk_rows)
+
+
+def iter_arrow(records: Iterable[Dict], columns: Sequence[str], chunk_rows: int = CHUNK_ROWS * 10) -> Chunks:
+    """Arrow IPC file format (readable with pyarrow.ipc.open_file / pandas.read_feather)."""
+    import pyarrow as pa
+
+    return _iter_binary(records, columns, pa.ipc.new_file, chunk_rows)
+
+
+# -----------------------------
+# Roadmap export formats
+# -----------------------------
+
+# label -> (file extension, MIME type, chunk generator over (records, columns))
+ROADMAP_FORMATS: Dict[str, Tuple[str, str, Callable[[Iterable[Dict], Sequence[str]], Chunks]]] = {
+    "CSV": (".csv", "text/csv", iter_records_csv),
+    "CSV (gzip)": (".csv.gz", "application/gzip", lambda records, columns: gzip_chunks(iter_records_csv(records, columns))),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", iter_parquet),
+    "Arrow IPC": (".arrow", "application/vnd.apache.arrow.file", iter_arrow),
+}
+BINARY_FORMATS = ("Parquet", "Arrow IPC")
+
+
+def roadmap_formats() -> List[str]:
+    return [f for f in ROADMAP_FORMATS if f not in BINARY_FORMATS or binary_available()]
+
+
+def roadmap_format_for(path: str) -> str:
+    """Export format implied by a file name (CSV if nothing else matches)."""
+    lower = path.lower()
+    for label, (ext, _, _) in sorted(ROADMAP_FORMATS.items(), key=lambda kv: -len(kv[1][0])):
+        if lower.endswith(ext):
+            return label
+    if lower.endswith(".feather"):
+        return "Arrow IPC"
+    return "CSV"
+
+
+def iter_roadmap(records: Iterable[Dict], fmt: str = "CSV") -> Chunks:
+    return ROADMAP_FORMATS[fmt][2](records, ROADMAP_COLUMNS)
+
+
+def roadmap_bytes(roadmap, fmt: str = "CSV") -> bytes:
+    """A RoadmapAggregator's rows as one file in ``fmt`` (for download buttons)."""
+    return join(iter_roadmap(roadmap.records(), fmt))
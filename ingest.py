@@ -0,0 +1,205 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import Counter
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from catalog import RuleCatalog, current
+from engine import SEPARATOR_TABLE, results_from_signals, results_payload, signals_from_counts
+
+# =============================================================
+# Agentic AI CEO — large-document ingestion
+# -------------------------------------------------------------
+# Scores multi-megabyte problem documents (txt / markdown / CSV of
+# incident notes) as a stream of chunks instead of one giant
+# string. Keyword counts, the token count behind length_bonus and
+# the character count behind length_factor are accumulated per
+# chunk; a partial token and the last few whole tokens are carried
+# over so keywords that straddle a chunk boundary still count.
+# Peak memory is one chunk plus a handful of counters.
+#
+#   python ingest.py board_pack.md --decision "Acquire X and pivot to cloud"
+# =============================================================
+
+CHUNK_CHARS = 1 << 20  # ~1M characters per read
+TEXT_EXTENSIONS = (".txt", ".md", ".markdown", ".log")
+CSV_EXTENSIONS = (".csv",)
+
+
+class StreamScanner:
+    """Incremental engine.case_signals(): feed() text chunks in order, then signals()."""
+
+    def __init__(self, legacy: bool = False, catalog: Optional[RuleCatalog] = None):
+        self.legacy = legacy
+        self.catalog = catalog or current()
+        self.matcher = matcher = self.catalog.matcher
+        self.n_chars = 0
+        self.n_tokens = 0
+        self._counts: Counter = Counter()
+        self._pending = ""  # trailing token that may continue in the next chunk
+        self._context: List[str] = []  # last whole tokens, for multi-word phrases
+        self._closed = False
+        # legacy (substring) mode state
+        self._tail = ""
+        self._tail_len = matcher.max_keyword_chars - 1
+        self._legacy_hits = [0] * len(matcher.theme_names)
+        self._risk_seen: set = set()
+
+    def feed(self, chunk: str) -> None:
+        if self._closed:
+            raise ValueError("scanner already closed")
+        low = chunk.lower()
+        self.n_chars += len(low)
+        if self.legacy:
+            self._feed_legacy(low)
+        buf = (self._pending + low).translate(SEPARATOR_TABLE)
+        tokens = buf.split()
+        # no trailing separator/space: the last token may go on in the next chunk
+        self._pending = tokens.pop() if tokens and not buf[-1].isspace() else ""
+        self._feed_tokens(tokens)
+
+    def _feed_tokens(self, tokens: List[str]) -> None:
+        if not tokens:
+            return
+        self.n_tokens += len(tokens)
+        window = self._context + tokens
+        self._counts.update(self.matcher.count_phrases(window, skip=len(self._context)))
+        keep = self.matcher.max_phrase_tokens - 1
+        self._context = window[-keep:] if keep else []
+
+    def _feed_legacy(self, low: str) -> None:
+        # a match that lies entirely inside the carried tail was counted with the previous chunk
+        window = self._tail + low
+        for i, theme in enumerate(self.matcher.theme_names):
+            for trig in self.matcher.triggers[theme]:
+                self._legacy_hits[i] += window.count(trig) - self._tail.count(trig)
+        for kw in self.matcher.risky_keywords:
+            if kw not in self._risk_seen and kw in window:
+                self._risk_seen.add(kw)
+        self._tail = window[-self._tail_len:] if self._tail_len else ""
+
+    def close(self) -> None:
+        if not self._closed:
+            if self._pending:
+                self._feed_tokens([self._pending])
+                self._pending = ""
+            self._closed = True
+
+    def risk_keywords(self) -> List[str]:
+        """Risk keywords found so far (in catalog order)."""
+        if self.legacy:
+            return [kw for kw in self.matcher.risky_keywords if kw in self._risk_seen]
+        return self.matcher.present_risks(self._counts)
+
+    def totals(self) -> Tuple[List[int], Tuple[int, int, int]]:
+        """(hits per theme, summed risk deltas) for everything fed so far."""
+        self.close()
+        if self.legacy:
+            ds = do = dd = 0
+            for kw in self._risk_seen:
+                a, b, c = self.matcher.risky_keywords[kw]
+                ds += a; do += b; dd += c
+            return self._legacy_hits, (ds, do, dd)
+        return self.matcher.totals(self._counts)
+
+    def signals(self) -> Tuple[Dict[str, float], Tuple[int, int, int]]:
+        """(theme scores, base S/O/D), identical to case_signals() on the concatenated text."""
+        hits, deltas = self.totals()
+        return signals_from_counts(hits, deltas, self.n_tokens, self.n_chars, self.catalog)
+
+
+# -----------------------------
+# Chunk sources
+# -----------------------------
+
+def iter_text_chunks(fh: TextIO, size: int = CHUNK_CHARS) -> Iterator[str]:
+    while True:
+        chunk = fh.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_csv_chunks(fh: TextIO, size: int = CHUNK_CHARS) -> Iterator[str]:
+    """CSV rows as text (cells joined by spaces, one line per row), batched into ~size chunks."""
+    buf: List[str] = []
+    n = 0
+    for row in csv.reader(fh):
+        line = " ".join(row) + "\n"
+        buf.append(line)
+        n += len(line)
+        if n >= size:
+            yield "".join(buf)
+            buf, n = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+def document_kind(name: str) -> str:
+    return "csv" if name.lower().endswith(CSV_EXTENSIONS) else "text"
+
+
+def document_chunks(raw: BinaryIO, name: str, size: int = CHUNK_CHARS) -> Iterator[str]:
+    """Decode a binary file object (path-opened or uploaded) as UTF-8 and yield text chunks."""
+    fh = io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="" if document_kind(name) == "csv" else None)
+    try:
+        if document_kind(name) == "csv":
+            yield from iter_csv_chunks(fh, size)
+        else:
+            yield from iter_text_chunks(fh, size)
+    finally:
+        fh.detach()  # leave the caller's file object open
+
+
+# -----------------------------
+# Engine entry points
+# -----------------------------
+
+def scan_case(chunks: Iterable[str], decision: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> StreamScanner:
+    """Feed a streamed problem, the joining space and the decision into a closed scanner."""
+    scanner = StreamScanner(legacy, catalog)
+    for chunk in chunks:
+        scanner.feed(chunk)
+    scanner.feed(" ")
+    scanner.feed(decision)
+    scanner.close()
+    return scanner
+
+
+def stream_signals(chunks: Iterable[str], decision: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Tuple[Dict[str, float], Tuple[int, int, int]]:
+    """case_signals(problem, decision) where the problem arrives as a stream of chunks."""
+    return scan_case(chunks, decision, legacy, catalog).signals()
+
+
+def document_result(chunks: Iterable[str], decision: str, label: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Dict:
+    """engine.case_result() for a streamed problem document; ``label`` stands in for the problem text."""
+    catalog = catalog or current()
+    signals = stream_signals(chunks, decision, legacy, catalog)
+    return results_from_signals([(label, decision)], [signals], catalog)[0]
+
+
+def document_label(name: str, n_bytes: Optional[int] = None) -> str:
+    size = f", {n_bytes:,} bytes" if n_bytes is not None else ""
+    return f"[document: {name}{size}]"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Score a large problem document (txt/md/csv) against a CEO decision.")
+    ap.add_argument("path", help="problem document")
+    ap.add_argument("--decision", required=True, help="decision taken by the CEO")
+    ap.add_argument("--legacy-match", action="store_true", help="use the old substring keyword matching")
+    args = ap.parse_args(argv)
+
+    label = document_label(os.path.basename(args.path), os.path.getsize(args.path))
+    with open(args.path, "rb") as raw:
+        result = document_result(document_chunks(raw, args.path), args.decision, label, args.legacy_match)
+    json.dump(results_payload(label, args.decision, result), sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from catalog import RuleCatalog, current
+from engine import build_mitigations, case_signals, rank_themes, score_matrix, signals_from_counts, tokenize
+from matcher import KeywordMatcher
+from profiling import stage
+from roadmap import RoadmapAggregator, group_key
+
+# =============================================================
+# Agentic AI CEO — incremental live re-scoring
+# -------------------------------------------------------------
+# LiveCase.update(problem, decision) returns the same result as
+# engine.case_result() but reuses the previous call's work:
+#
+# - Problem and Decision are split into paragraphs (blank lines).
+#   Each paragraph keeps its phrase counts, token count and length,
+#   so an edit only re-scans the paragraphs that changed (plus the
+#   next one when its look-behind context for multi-word phrases
+#   changed); document totals are patched by subtracting the old
+#   counts and adding the new.
+# - Theme scores and base S/O/D come from those totals; a leader's
+#   mitigations are rebuilt only when its S/O/D or the top themes
+#   moved, and only the roadmap groups those leaders touch are
+#   rebuilt.
+#
+# Paragraph boundaries are newlines, which are token separators,
+# so no token spans two paragraphs. legacy=True (substring
+# matching, where matches can span anything) re-scans the whole
+# text and only the scoring half is incremental. A new rule
+# catalog (hot reload) starts the state over.
+# =============================================================
+
+PARAGRAPH = "\n\n"
+
+
+class _Segment:
+    """One paragraph: its text and the phrase counts of the phrases ending in it."""
+
+    __slots__ = ("text", "context", "tail", "counts", "n_tokens", "n_chars")
+
+    def __init__(self, text: str, context: Tuple[str, ...], matcher: KeywordMatcher):
+        tokens = tokenize(text)
+        keep = matcher.max_phrase_tokens - 1  # look-behind a multi-word phrase can need
+        self.text = text
+        self.context = context
+        self.tail = tuple(tokens[-keep:]) if keep else ()
+        if context:
+            self.counts = matcher.count_phrases(list(context) + tokens, skip=len(context))
+        else:
+            self.counts = matcher.count_phrases(tokens)
+        self.n_tokens = len(tokens)
+        self.n_chars = len(text.lower())
+
+
+def _segments_of(problem: str, decision: str) -> Tuple[List[str], int]:
+    """Paragraph texts of problem then decision, and how many belong to the problem."""
+    head = problem.split(PARAGRAPH)
+    return head + decision.split(PARAGRAPH), len(head)
+
+
+class LiveCase:
+    """Incrementally re-scored case for live previews; call update() after every edit."""
+
+    def __init__(self, legacy: bool = False, catalog: Optional[RuleCatalog] = None):
+        self.legacy = legacy
+        self._reset(catalog or current())
+        # what the last update() did
+        self.rescanned = 0
+        self.changed: List[str] = []
+        self.seconds = 0.0
+
+    def _reset(self, catalog: RuleCatalog) -> None:
+        self.catalog = catalog
+        self.matcher = catalog.matcher
+        self._context_tokens = self.matcher.max_phrase_tokens - 1
+        n_leaders = len(catalog.leader_names)
+        self._segments: List[_Segment] = []
+        self._n_problem = 0
+        self._counts: Counter = Counter()
+        self.n_tokens = 0
+        self._sod: List[Optional[Tuple[int, int, int]]] = [None] * n_leaders
+        self._top: List[str] = []
+        self._actions: List[List[Dict]] = [[] for _ in range(n_leaders)]
+        self._rows: List[Dict] = [{} for _ in range(n_leaders)]
+        self.roadmap = RoadmapAggregator()
+
+    @property
+    def n_chars(self) -> int:
+        """Length of f"{problem} {decision}" (paragraph breaks and the joining space included)."""
+        n_breaks = len(self._segments) - 2
+        return sum(s.n_chars for s in self._segments) + len(PARAGRAPH) * n_breaks + 1
+
+    # -----------------------------
+    # Text side
+    # -----------------------------
+
+    def _context(self, segments: List[_Segment], j: int) -> Tuple[str, ...]:
+        """The look-behind tokens (max phrase length - 1) before segment j."""
+        keep = self._context_tokens
+        if not keep:
+            return ()
+        need: Tuple[str, ...] = ()
+        for seg in reversed(segments[:j]):
+            need = seg.tail + need
+            if len(need) >= keep:
+                break
+        return need[-keep:]
+
+    def _swap(self, old: Optional[_Segment], new: _Segment) -> None:
+        if old is not None:
+            self._counts.subtract(old.counts)
+            self.n_tokens -= old.n_tokens
+        self._counts.update(new.counts)
+        self.n_tokens += new.n_tokens
+
+    def _rescan(self, problem: str, decision: str) -> None:
+        texts, n_problem = _segments_of(problem, decision)
+        old = self._segments
+        # the edit is what lies between the unchanged first and last paragraphs
+        limit = min(len(old), len(texts))
+        p = 0
+        while p < limit and old[p].text == texts[p]:
+            p += 1
+        s = 0
+        while s < limit - p and old[-1 - s].text == texts[-1 - s]:
+            s += 1
+
+        segments = old[:p]
+        for seg in old[p:len(old) - s]:
+            self._counts.subtract(seg.counts)
+            self.n_tokens -= seg.n_tokens
+        for text in texts[p:len(texts) - s]:
+            seg = _Segment(text, self._context(segments, len(segments)), self.matcher)
+            self._swap(None, seg)
+            segments.append(seg)
+        rescanned = len(segments) - p
+        # unchanged paragraphs after the edit only need a re-scan while their context differs
+        stale = True
+        for seg in old[len(old) - s:]:
+            if stale:
+                context = self._context(segments, len(segments))
+                if context != seg.context:
+                    fresh = _Segment(seg.text, context, self.matcher)
+                    self._swap(seg, fresh)
+                    seg = fresh
+                    rescanned += 1
+                else:
+                    stale = False
+            segments.append(seg)
+        self._segments = segments
+        self._n_problem = n_problem
+        self.rescanned = rescanned
+
+    def signals(self) -> Tuple[Dict[str, float], Tuple[int, int, int]]:
+        """(theme scores, base S/O/D) of the current text, as engine.case_signals()."""
+        hits, deltas = self.matcher.totals(self._counts)
+        return signals_from_counts(hits, deltas, self.n_tokens, self.n_chars, self.catalog)
+
+    def risk_keywords(self) -> List[str]:
+        return self.matcher.present_risks(self._counts)
+
+    def segment_rows(self) -> List[Dict]:
+        """Per-paragraph token counts, theme hits and risk keywords (for inspection)."""
+        rows = []
+        for i, seg in enumerate(self._segments):
+            hits, deltas = self.matcher.totals(seg.counts)
+            rows.append({
+                "Part": "Problem" if i < self._n_problem else "Decision",
+                "Tokens": seg.n_tokens,
+                "Theme hits": sum(hits),
+                "Risk keywords": ", ".join(self.matcher.present_risks(seg.counts)),
+                "ΔS/ΔO/ΔD": "/".join(map(str, deltas)),
+            })
+        return rows
+
+    # -----------------------------
+    # Scoring side
+    # -----------------------------
+
+    def update(self, problem: str, decision: str, catalog: Optional[RuleCatalog] = None) -> Dict:
+        """Re-score after an edit; returns a result shaped like engine.case_result().
+
+        The result's roadmap is this LiveCase's aggregator, patched in place
+        by the next update().
+        """
+        t0 = time.perf_counter()
+        catalog = catalog or current()
+        if catalog is not self.catalog:
+            self._reset(catalog)
+        with stage("live.scan"):
+            if self.legacy:
+                theme_scores, base = case_signals(problem, decision, True, catalog)
+                self.rescanned = len(_segments_of(problem, decision)[0])
+            else:
+                self._rescan(problem, decision)
+                theme_scores, base = self.signals()
+
+        with stage("live.score"):
+            sod, _, _ = score_matrix([base], catalog.leader_bias)
+            top = rank_themes(theme_scores)
+            touched = set()
+            changed = []
+            for i, (leader, leader_sod) in enumerate(zip(catalog.leader_names, sod[0].tolist())):
+                leader_sod = tuple(leader_sod)
+                if leader_sod == self._sod[i] and top == self._top:
+                    continue
+                sev, occ, det = leader_sod
+                touched.update(group_key(a) for a in self._actions[i])
+                self._actions[i] = build_mitigations(problem, decision, leader, sev, occ, det, theme_scores, top, catalog)
+                touched.update(group_key(a) for a in self._actions[i])
+                self._rows[i] = {"Leader": leader, "Severity": sev, "Occurrence": occ, "Detection": det, "RPN": sev * occ * det}
+                self._sod[i] = leader_sod
+                changed.append(leader)
+            self._top = top
+            actions = [a for leader_actions in self._actions for a in leader_actions]
+            if touched:
+                self.roadmap.regroup(touched, actions)
+
+        self.changed = changed
+        self.seconds = time.perf_counter() - t0
+        return {
+            "theme_scores": theme_scores,
+            "fmea": list(self._rows),
+            "actions": actions,
+            "roadmap": self.roadmap,
+        }
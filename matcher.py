@@ -0,0 +1,123 @@
+from collections import Counter
+from itertools import compress
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+# =============================================================
+# Agentic AI CEO — compiled keyword matcher
+# -------------------------------------------------------------
+# Theme triggers and FMEA risk keywords are compiled once into
+# token-phrase tables. A scan walks the token list a single time
+# (Counter over unigrams, plus a look-ahead only at positions that
+# start a multi-word trigger such as "lead time"), so cost no
+# longer grows with themes × triggers × text length.
+#
+# Matching is on whole tokens: "ai" no longer fires inside
+# "said", nor "pr" inside "product". scan_legacy() keeps the old
+# substring semantics so historical scores can be reproduced.
+#
+# Totals are summed over the phrases a text actually contains,
+# so scoring cost does not grow with the size of the catalog
+# (10k+ triggers); only scan_legacy() still walks every trigger.
+# =============================================================
+
+TOKEN_SEPARATORS = ",.;:!?()[]{}|\n\t\r-/_"
+# one translate() pass instead of a str.replace per separator
+SEPARATOR_TABLE = str.maketrans({ch: " " for ch in TOKEN_SEPARATORS})
+
+
+def tokenize(text: str) -> List[str]:
+    return text.lower().translate(SEPARATOR_TABLE).split()
+
+
+# single-token phrases are keyed by the bare token, longer ones by a tuple
+Phrase = Union[str, Tuple[str, ...]]
+Deltas = Tuple[int, int, int]
+
+
+class KeywordMatcher:
+    """Theme hit counts + risk-keyword S/O/D deltas from one pass over tokens."""
+
+    def __init__(self, themes: Dict[str, Dict], risky_keywords: Dict[str, Deltas], tokenize: Callable[[str], List[str]] = tokenize):
+        self.theme_names: List[str] = list(themes)
+        self.triggers: Dict[str, List[str]] = {t: list(spec["triggers"]) for t, spec in themes.items()}
+        self.risky_keywords: Dict[str, Deltas] = dict(risky_keywords)
+
+        def phrase(text: str) -> Phrase:
+            toks = tuple(tokenize(text))
+            return toks[0] if len(toks) == 1 else toks
+
+        # phrase -> theme indices it counts towards (a trigger may sit in several themes)
+        self._theme_phrases: Dict[Phrase, List[int]] = {}
+        for i, theme in enumerate(self.theme_names):
+            for trig in self.triggers[theme]:
+                self._theme_phrases.setdefault(phrase(trig), []).append(i)
+        # phrase -> summed deltas of the keywords that tokenize to it
+        self._risk_phrases: Dict[Phrase, Deltas] = {}
+        # phrase -> (position, keyword) of the keywords behind it, for present_risks()
+        self._phrase_keywords: Dict[Phrase, List[Tuple[int, str]]] = {}
+        for pos, (kw, d) in enumerate(self.risky_keywords.items()):
+            p = phrase(kw)
+            prev = self._risk_phrases.get(p, (0, 0, 0))
+            self._risk_phrases[p] = (prev[0] + d[0], prev[1] + d[1], prev[2] + d[2])
+            self._phrase_keywords.setdefault(p, []).append((pos, kw))
+
+        # multi-word phrases, grouped by their first token
+        self._heads: Dict[str, List[Tuple[str, ...]]] = {}
+        for p in set(self._theme_phrases) | set(self._risk_phrases):
+            if isinstance(p, tuple):
+                self._heads.setdefault(p[0], []).append(p)
+        # only these tokens are ever counted, so counts stay small on huge documents
+        self._vocab = {p for p in set(self._theme_phrases) | set(self._risk_phrases) if isinstance(p, str)} | set(self._heads)
+        self.max_phrase_tokens = max((len(p) for ps in self._heads.values() for p in ps), default=1)
+        # longest raw trigger/keyword, for substring matching across chunk borders
+        self.max_keyword_chars = max((len(k) for k in list(self.risky_keywords) + [t for ts in self.triggers.values() for t in ts]), default=1)
+
+    def count_phrases(self, tokens: Sequence[str], skip: int = 0) -> Counter:
+        """Occurrences of every known phrase in tokens.
+
+        With ``skip``, tokens[:skip] is look-behind context (already counted by
+        the caller): only phrases ending at or after tokens[skip] are counted.
+        """
+        counts = Counter(filter(self._vocab.__contains__, tokens[skip:] if skip else tokens))
+        heads = self._heads
+        if skip or any(h in counts for h in heads):
+            # only positions holding a head token are inspected (compress/map stay in C)
+            for i in compress(range(len(tokens)), map(heads.__contains__, tokens)):
+                for p in heads[tokens[i]]:
+                    end = i + len(p)
+                    if end > skip and tuple(tokens[i:end]) == p:
+                        counts[p] += 1
+        return counts
+
+    def totals(self, counts: Counter) -> Tuple[List[int], Deltas]:
+        """(hits per theme in theme order, summed risk deltas) from phrase counts."""
+        hits = [0] * len(self.theme_names)
+        ds = do = dd = 0
+        theme_phrases, risk_phrases = self._theme_phrases, self._risk_phrases
+        for phrase, n in counts.items():
+            if not n:
+                continue
+            for i in theme_phrases.get(phrase, ()):
+                hits[i] += n
+            d = risk_phrases.get(phrase)
+            if d is not None:
+                ds += d[0]; do += d[1]; dd += d[2]
+        return hits, (ds, do, dd)
+
+    def present_risks(self, counts: Counter) -> List[str]:
+        """Risk keywords that occur in the phrase counts (in catalog order)."""
+        found = [pk for phrase, n in counts.items() if n for pk in self._phrase_keywords.get(phrase, ())]
+        return [kw for _, kw in sorted(found)]
+
+    def scan(self, tokens: Sequence[str]) -> Tuple[List[int], Deltas]:
+        """Return (hits per theme in theme order, summed risk deltas) for lowercase tokens."""
+        return self.totals(self.count_phrases(tokens))
+
+    def scan_legacy(self, text: str) -> Tuple[List[int], Deltas]:
+        """Same output as scan(), using the original substring semantics on lowercase text."""
+        hits = [sum(text.count(trig) for trig in self.triggers[theme]) for theme in self.theme_names]
+        ds = do = dd = 0
+        for kw, (a, b, c) in self.risky_keywords.items():
+            if kw in text:
+                ds += a; do += b; dd += c
+        return hits, (ds, do, dd)
@@ -0,0 +1,235 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# =============================================================
+# Agentic AI CEO — per-stage profiling
+# -------------------------------------------------------------
+# Hot paths are wrapped in `with stage("engine.signals"): ...`.
+# Nothing is measured unless a profiled run is active in the
+# current context (start_run() / finish_run(), per Streamlit
+# session thread or asyncio task); otherwise stage() is one
+# ContextVar lookup returning a shared no-op context manager.
+#
+# A profiled run records wall time per stage, optionally net
+# traced bytes per stage (tracemalloc, memory=True, slower), and
+# the deep size / object count of big intermediates passed to
+# record_size(). finish_run() folds the run into process-wide
+# totals and can write them in Prometheus text format:
+#
+#   agentic_ceo_stage_seconds_total{stage="engine.mitigations"} 0.0123
+#
+# PROFILE_STAGES=1 turns profiling on by default in the app;
+# PROFILE_METRICS_FILE sets the metrics file (stage_metrics.prom).
+# =============================================================
+
+METRICS_FILE = os.environ.get("PROFILE_METRICS_FILE", "stage_metrics.prom")
+PREFIX = "agentic_ceo"
+
+_NOOP = nullcontext()
+
+
+class RunProfile:
+    """Stage timings, allocations and object sizes of one profiled run."""
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.stages: Dict[str, List[float]] = {}  # name -> [calls, seconds, net bytes]
+        self.sizes: Dict[str, Tuple[int, int]] = {}  # name -> (objects, bytes)
+        self.peak_bytes = 0
+        self.seconds = 0.0
+        self._own_tracemalloc = False
+        self._started = time.perf_counter()
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._own_tracemalloc = True
+            tracemalloc.reset_peak()
+
+    def add(self, name: str, seconds: float, net_bytes: int = 0) -> None:
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [1, seconds, net_bytes]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += net_bytes
+
+    def finish(self) -> None:
+        self.seconds = time.perf_counter() - self._started
+        if self.memory:
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+
+    def rows(self) -> List[Dict]:
+        """Per-stage breakdown, slowest first (stages nest, so shares can add up to more than 100%)."""
+        total = self.seconds or sum(s for _, s, _ in self.stages.values()) or 1.0
+        rows = []
+        for name, (calls, seconds, net) in sorted(self.stages.items(), key=lambda kv: kv[1][1], reverse=True):
+            row = {"Stage": name, "Calls": int(calls), "ms": round(seconds * 1e3, 3), "Share": f"{seconds / total:.0%}"}
+            if self.memory:
+                row["Net KB"] = round(net / 1024, 1)
+            rows.append(row)
+        return rows
+
+    def size_rows(self) -> List[Dict]:
+        return [{"Object": name, "Objects": n, "KB": round(b / 1024, 1)} for name, (n, b) in self.sizes.items()]
+
+
+class _Stage:
+    __slots__ = ("run", "name", "t0", "m0")
+
+    def __init__(self, run: RunProfile, name: str):
+        self.run = run
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.m0 = tracemalloc.get_traced_memory()[0] if self.run.memory else 0
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        seconds = time.perf_counter() - self.t0
+        net = tracemalloc.get_traced_memory()[0] - self.m0 if self.run.memory else 0
+        self.run.add(self.name, seconds, net)
+
+
+_CURRENT: ContextVar[Optional[RunProfile]] = ContextVar("profile_run", default=None)
+
+
+def stage(name: str):
+    """Context manager timing ``name`` in the active profiled run (no-op when none is active)."""
+    run = _CURRENT.get()
+    if run is None:
+        return _NOOP
+    return _Stage(run, name)
+
+
+def active() -> bool:
+    return _CURRENT.get() is not None
+
+
+def deep_size(obj) -> Tuple[int, int]:
+    """(objects, bytes) reachable through dicts/lists/tuples/sets; shared objects count once."""
+    seen = set()
+    stack = [obj]
+    n = size = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        n += 1
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return n, size
+
+
+def record_size(name: str, obj) -> None:
+    """Record the deep size of a big intermediate object in the active profiled run."""
+    run = _CURRENT.get()
+    if run is not None:
+        run.sizes[name] = deep_size(obj)
+
+
+# -----------------------------
+# Runs and process-wide totals
+# -----------------------------
+
+class Totals:
+    """Cumulative stage metrics over every finished run in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.run_seconds = 0.0
+        self.peak_bytes = 0
+        self.stages: Dict[str, List[float]] = {}  # name -> [calls, seconds, net bytes, last run seconds]
+        self.sizes: Dict[str, Tuple[int, int]] = {}
+
+    def merge(self, run: RunProfile) -> None:
+        with self._lock:
+            self.runs += 1
+            self.run_seconds += run.seconds
+            self.peak_bytes = max(self.peak_bytes, run.peak_bytes)
+            for name, (calls, seconds, net) in run.stages.items():
+                entry = self.stages.setdefault(name, [0, 0.0, 0, 0.0])
+                entry[0] += calls
+                entry[1] += seconds
+                entry[2] += net
+                entry[3] = seconds
+            self.sizes.update(run.sizes)
+
+    def prometheus(self) -> str:
+        with self._lock:
+            lines = [
+                f"# HELP {PREFIX}_profiled_runs_total Profiled runs since process start.",
+                f"# TYPE {PREFIX}_profiled_runs_total counter",
+                f"{PREFIX}_profiled_runs_total {self.runs}",
+                f"# HELP {PREFIX}_run_seconds_total Wall time of profiled runs.",
+                f"# TYPE {PREFIX}_run_seconds_total counter",
+                f"{PREFIX}_run_seconds_total {self.run_seconds:.6f}",
+                f"# HELP {PREFIX}_run_peak_bytes Highest traced memory peak of a profiled run (0 unless allocations are tracked).",
+                f"# TYPE {PREFIX}_run_peak_bytes gauge",
+                f"{PREFIX}_run_peak_bytes {self.peak_bytes}",
+            ]
+            families = [
+                ("stage_calls_total", "counter", "Times each stage ran.", 0, "{:.0f}"),
+                ("stage_seconds_total", "counter", "Wall time spent in each stage.", 1, "{:.6f}"),
+                ("stage_alloc_bytes_total", "counter", "Net traced bytes allocated in each stage.", 2, "{:.0f}"),
+                ("stage_last_run_seconds", "gauge", "Wall time of each stage in the latest run.", 3, "{:.6f}"),
+            ]
+            for metric, kind, doc, i, fmt in families:
+                lines += [f"# HELP {PREFIX}_{metric} {doc}", f"# TYPE {PREFIX}_{metric} {kind}"]
+                lines += [f'{PREFIX}_{metric}{{stage="{name}"}} {fmt.format(v[i])}' for name, v in sorted(self.stages.items())]
+            for metric, i, doc in (("object_count", 0, "Objects reachable from a big intermediate (latest run)."), ("object_bytes", 1, "Deep size of a big intermediate (latest run).")):
+                lines += [f"# HELP {PREFIX}_{metric} {doc}", f"# TYPE {PREFIX}_{metric} gauge"]
+                lines += [f'{PREFIX}_{metric}{{object="{name}"}} {v[i]}' for name, v in sorted(self.sizes.items())]
+        return "\n".join(lines) + "\n"
+
+
+TOTALS = Totals()
+_WRITE_LOCK = threading.Lock()  # sessions finish on their own threads
+
+
+def start_run(enabled: bool = True, memory: bool = False) -> Optional[RunProfile]:
+    """Make a new profiled run (or none, if not enabled) current for this context."""
+    run = RunProfile(memory) if enabled else None
+    _CURRENT.set(run)
+    return run
+
+
+def finish_run(run: Optional[RunProfile], metrics_path: Optional[str] = METRICS_FILE) -> None:
+    """End the run, add it to TOTALS and rewrite the Prometheus metrics file (atomically).
+
+    The metrics file is best effort: if it cannot be written, the run is
+    still counted and nothing is raised.
+    """
+    _CURRENT.set(None)
+    if run is None:
+        return
+    run.finish()
+    TOTALS.merge(run)
+    if metrics_path:
+        # one writer per process at a time; the pid keeps processes sharing the file apart
+        tmp = f"{metrics_path}.{os.getpid()}.tmp"
+        with _WRITE_LOCK:
+            try:
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    fh.write(TOTALS.prometheus())
+                os.replace(tmp, metrics_path)
+            except OSError:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
@@ -0,0 +1,105 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# =============================================================
+# Agentic AI CEO — incremental roadmap aggregator
+# -------------------------------------------------------------
+# Replaces the pandas groupby (with per-group Python lambdas) that
+# built the combined roadmap. Actions are folded in as they are
+# produced, keyed by (Action, Owner, Theme, KPI, StartBy); each
+# group keeps its summed RPN weight plus leader and rationale sets.
+#
+# Memory is bounded by the number of distinct groups (the action
+# catalog × timeline buckets), not by the number of cases, and
+# partial aggregates from parallel workers merge with merge()/+=.
+# A DataFrame is only built at the end, in to_frame(), which is
+# also the only place pandas gets imported.
+# =============================================================
+
+ROADMAP_KEYS = ["Action", "Owner", "Theme", "KPI", "StartBy"]
+ROADMAP_COLUMNS = ROADMAP_KEYS + ["Weight", "SupportedBy", "Rationale"]
+
+GroupKey = Tuple[str, str, str, str, str]
+
+
+def group_key(action: Dict) -> GroupKey:
+    return action["Action"], action["Owner"], action["Theme"], action["KPI"], action["StartBy"]
+
+
+class RoadmapAggregator:
+    """Risk-weighted roadmap built incrementally from mitigation action dicts."""
+
+    def __init__(self, actions: Iterable[Dict] = ()):
+        # key -> [weight, leaders, rationales]
+        self._groups: Dict[GroupKey, list] = {}
+        self.extend(actions)
+
+    def add(self, action: Dict) -> None:
+        key = group_key(action)
+        group = self._groups.get(key)
+        if group is None:
+            self._groups[key] = [action["RPN"], {action["Leader"]}, {action["Why"]}]
+        else:
+            group[0] += action["RPN"]
+            group[1].add(action["Leader"])
+            group[2].add(action["Why"])
+
+    def extend(self, actions: Iterable[Dict]) -> None:
+        for action in actions:
+            self.add(action)
+
+    def merge(self, other: "RoadmapAggregator") -> "RoadmapAggregator":
+        """Fold another (e.g. a worker's partial) aggregate into this one."""
+        for key, (weight, leaders, whys) in other._groups.items():
+            group = self._groups.get(key)
+            if group is None:
+                self._groups[key] = [weight, set(leaders), set(whys)]
+            else:
+                group[0] += weight
+                group[1] |= leaders
+                group[2] |= whys
+        return self
+
+    __iadd__ = merge
+
+    def regroup(self, keys: Iterable[GroupKey], actions: Iterable[Dict]) -> None:
+        """Rebuild only the groups under ``keys`` from ``actions`` (all current actions).
+
+        Groups keep sets, not counts, so a changed action cannot simply be
+        subtracted; patching the touched groups keeps the rest as they are.
+        """
+        keys = set(keys)
+        for key in keys:
+            self._groups.pop(key, None)
+        self.extend(a for a in actions if group_key(a) in keys)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def _rows(self) -> List[Tuple[int, Dict]]:
+        # same order as groupby(sort=True) then a stable sort by StartBy asc, Weight desc;
+        # each row is paired with its position in key order (the old frame index)
+        by_key = list(enumerate(sorted(self._groups)))
+        by_key.sort(key=lambda ik: (ik[1][4], -self._groups[ik[1]][0]))
+        rows = []
+        for i, key in by_key:
+            weight, leaders, whys = self._groups[key]
+            rows.append((i, {
+                **dict(zip(ROADMAP_KEYS, key)),
+                "Weight": weight,
+                "SupportedBy": ", ".join(sorted(leaders)),
+                "Rationale": "; ".join(sorted(whys)),
+            }))
+        return rows
+
+    def records(self) -> List[Dict]:
+        """Roadmap rows (ROADMAP_COLUMNS), highest priority first."""
+        return [row for _, row in self._rows()]
+
+    def to_frame(self) -> "pd.DataFrame":
+        import pandas as pd  # deferred: only the DataFrame view needs it
+
+        rows = self._rows()
+        return pd.DataFrame([row for _, row in rows], columns=ROADMAP_COLUMNS, index=[i for i, _ in rows])
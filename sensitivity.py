@@ -0,0 +1,172 @@
+from typing import BinaryIO, Dict, List, Optional
+
+import numpy as np
+
+from catalog import RuleCatalog
+from engine import BUCKET_LABELS, pick_actions_for_theme, rank_themes, raw_base, score_matrix, signals_from_counts
+from ingest import StreamScanner, document_chunks, scan_case
+
+# =============================================================
+# Agentic AI CEO — Monte Carlo sensitivity analysis
+# -------------------------------------------------------------
+# The engine's scores are point estimates (fixed 6/5/5 base,
+# integer keyword deltas, fixed style biases). Here the same
+# arithmetic runs on hundreds of thousands of perturbed samples at
+# once (NumPy, in blocks) to show how robust each result is:
+#
+#   - keyword deltas: N(0, keyword_sigma) per matched keyword and
+#     S/O/D component (summed: N(0, keyword_sigma * sqrt(n)))
+#   - style biases:   N(0, style_sigma) per leader and component
+#   - theme weights:  multiplicative log-normal, sigma theme_sigma
+#
+# Rounding and clamping follow clamp(), so with all sigmas at 0
+# every sample reproduces the engine's point result exactly.
+# =============================================================
+
+NOT_SELECTED = "not selected"
+RPN_MAX = 1000
+
+
+def sensitivity_inputs(scanner: StreamScanner) -> Dict:
+    """Point inputs for simulate() from a closed scanner (see ingest.scan_case)."""
+    hits, deltas = scanner.totals()
+    theme_scores, base = signals_from_counts(hits, deltas, scanner.n_tokens, scanner.n_chars, scanner.catalog)
+    return {
+        "catalog": scanner.catalog,
+        "theme_scores": theme_scores,
+        "base": base,
+        "raw_base": raw_base(deltas, scanner.n_chars),
+        "risk_keywords": scanner.risk_keywords(),
+    }
+
+
+def case_inputs(problem: str, decision: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Dict:
+    return sensitivity_inputs(scan_case([problem], decision, legacy, catalog))
+
+
+def document_inputs(raw: BinaryIO, name: str, decision: str, legacy: bool = False, catalog: Optional[RuleCatalog] = None) -> Dict:
+    """case_inputs() for an uploaded problem document (re-streamed from the start)."""
+    raw.seek(0)
+    return sensitivity_inputs(scan_case(document_chunks(raw, name), decision, legacy, catalog))
+
+
+def _quantiles(hist: np.ndarray, qs: List[float]) -> List[int]:
+    cdf = np.cumsum(hist)
+    return [int(np.searchsorted(cdf, q * cdf[-1])) for q in qs]
+
+
+def simulate(
+    inputs: Dict,
+    samples: int = 200_000,
+    keyword_sigma: float = 0.5,
+    style_sigma: float = 0.5,
+    theme_sigma: float = 0.25,
+    seed: int = 0,
+    block: int = 50_000,
+) -> Dict:
+    """Sample perturbed scores; return per-leader RPN/bucket stats, theme stability and per-action bucket odds.
+
+    An action's StartBy is its earliest bucket across the leaders proposing
+    it; theme actions are "not selected" in samples where their theme drops
+    out of the top 3.
+    """
+    rng = np.random.default_rng(seed)
+    themes = list(inputs["theme_scores"])
+    scores = np.array([inputs["theme_scores"][t] for t in themes], dtype=np.float64)
+    raw = np.array(inputs["raw_base"], dtype=np.float64)
+    kw_scale = keyword_sigma * np.sqrt(len(inputs["risk_keywords"]))
+    catalog = inputs["catalog"]
+    bias = catalog.leader_bias.astype(np.float64)
+    n_leaders, n_themes, n_buckets = bias.shape[0], len(themes), len(BUCKET_LABELS)
+
+    point_top = rank_themes(inputs["theme_scores"])
+    point_mask = np.isin(themes, point_top)
+
+    rpn_hist = np.zeros(n_leaders * (RPN_MAX + 1), dtype=np.int64)
+    bucket_counts = np.zeros(n_leaders * n_buckets, dtype=np.int64)
+    top3_counts = np.zeros(n_themes, dtype=np.int64)
+    theme_bucket_counts = np.zeros(n_buckets * n_themes, dtype=np.int64)
+    stable = 0
+
+    leader_ix = np.arange(n_leaders)
+    theme_ix = np.arange(n_themes)
+    done = 0
+    while done < samples:
+        b = min(block, samples - done)
+        done += b
+
+        # S/O/D: perturbed keyword deltas, clamp, perturbed style bias, clamp
+        base = np.tile(raw, (b, 1))
+        if kw_scale:
+            base += rng.standard_normal((b, 3)) * kw_scale
+        base = np.clip(np.rint(base), 1, 10)
+        sod = base[:, None, :] + bias[None, :, :]
+        if style_sigma:
+            sod += rng.standard_normal((b, n_leaders, 3)) * style_sigma
+        sod = np.clip(np.rint(sod), 1, 10).astype(np.int32)
+        rpn = sod[..., 0] * sod[..., 1] * sod[..., 2]
+        bucket = (rpn < 180).astype(np.int64) + (rpn < 120)
+
+        rpn_hist += np.bincount((rpn + leader_ix * (RPN_MAX + 1)).ravel(), minlength=rpn_hist.size)
+        bucket_counts += np.bincount((bucket + leader_ix * n_buckets).ravel(), minlength=bucket_counts.size)
+
+        # themes: perturbed weights -> top 3 (stable order, like rank_themes)
+        w = scores[None, :] * (np.exp(rng.standard_normal((b, n_themes)) * theme_sigma) if theme_sigma else 1.0)
+        w = np.broadcast_to(w, (b, n_themes))
+        top = np.argsort(-w, axis=1, kind="stable")[:, :3]
+        in_top = np.zeros((b, n_themes), dtype=bool)
+        np.put_along_axis(in_top, top, True, axis=1)
+        top3_counts += in_top.sum(axis=0)
+        stable += int((in_top == point_mask).all(axis=1).sum())
+
+        earliest = bucket.min(axis=1)
+        idx = earliest[:, None] * n_themes + theme_ix[None, :]
+        theme_bucket_counts += np.bincount(idx[in_top], minlength=theme_bucket_counts.size)
+
+    rpn_hist = rpn_hist.reshape(n_leaders, RPN_MAX + 1)
+    bucket_p = bucket_counts.reshape(n_leaders, n_buckets) / samples
+    theme_bucket_p = theme_bucket_counts.reshape(n_buckets, n_themes).T / samples
+    _, point_rpn, _ = score_matrix([inputs["base"]], catalog.leader_bias)
+    values = np.arange(RPN_MAX + 1)
+
+    leaders = []
+    for i, leader in enumerate(catalog.leader_names):
+        p5, p50, p95 = _quantiles(rpn_hist[i], [0.05, 0.5, 0.95])
+        leaders.append({
+            "Leader": leader,
+            "RPN": int(point_rpn[0, i]),
+            "RPN mean": float((rpn_hist[i] * values).sum() / samples),
+            "RPN p5": p5,
+            "RPN p50": p50,
+            "RPN p95": p95,
+            **{f"P({label})": float(bucket_p[i, k]) for k, label in enumerate(BUCKET_LABELS)},
+        })
+
+    theme_rows = [
+        {"Theme": t, "Score": float(scores[j]), "Top 3 (point)": bool(point_mask[j]), "P(top 3)": float(top3_counts[j] / samples)}
+        for j, t in enumerate(themes)
+    ]
+    theme_rows.sort(key=lambda r: r["P(top 3)"], reverse=True)
+
+    actions = []
+    for j, t in enumerate(themes):
+        if not top3_counts[j]:
+            continue
+        probs = {f"P({label})": float(theme_bucket_p[j, k]) for k, label in enumerate(BUCKET_LABELS)}
+        probs[f"P({NOT_SELECTED})"] = float(1 - top3_counts[j] / samples)
+        for rec in pick_actions_for_theme(t, 2, catalog):
+            actions.append({**rec, **probs})
+    for i, leader in enumerate(catalog.leader_names):
+        guard = catalog.guardrail_for(leader)
+        if guard is not None:
+            probs = {f"P({label})": float(bucket_p[i, k]) for k, label in enumerate(BUCKET_LABELS)}
+            actions.append({**guard[1], **probs, f"P({NOT_SELECTED})": 0.0})
+
+    return {
+        "samples": samples,
+        "params": {"keyword_sigma": keyword_sigma, "style_sigma": style_sigma, "theme_sigma": theme_sigma, "seed": seed},
+        "top3_stability": stable / samples,
+        "leaders": leaders,
+        "themes": theme_rows,
+        "actions": actions,
+    }
@@ -0,0 +1,552 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from batch import INCOMPLETE, case_from_row, chunked, is_complete
+from cache import LRUCache, cache_key
+from catalog import current, reload_if_changed
+from engine import case_results, results_payload
+
+# =============================================================
+# Agentic AI CEO — HTTP scoring service
+# -------------------------------------------------------------
+# The engine behind a small asyncio HTTP/1.1 server, for tools
+# that want FMEA scores and roadmaps without the Streamlit page:
+#
+#   POST /score   {"problem", "decision"}   -> results JSON
+#   POST /batch   JSON array or NDJSON       -> NDJSON stream, one
+#                 line per case as it finishes ("index" = input
+#                 position, "id" = case id)
+#   GET  /health  liveness + catalog version
+#   GET  /metrics request/response/cache counters (JSON)
+#
+# ?legacy=1 selects the old substring keyword matching. Bodies are
+# the same payload as the UI's "Download Full Results (JSON)".
+#
+# Connections are kept alive (HTTP/1.1 default) until idle for
+# keepalive_timeout. The encoded scores are cached per normalized
+# case (cache.cache_key), so repeated inputs skip scoring and JSON
+# encoding; the problem/decision echo is added per request, since
+# differently cased or split inputs share a key.
+#
+# Backpressure: requests beyond max_inflight get 503 + Retry-After,
+# bodies and batches are size-capped (413), streamed lines wait for
+# the client to drain, and a batch keeps at most 2 * workers chunks
+# in the process pool.
+#
+# Rule files (catalog.py) are re-checked on each request, at most
+# every RULE_RELOAD_INTERVAL seconds; an edited catalog changes the
+# version and with it every cache key, and pool workers reload
+# before scoring a chunk keyed on a newer version.
+#
+#   python service.py --port 8080 --workers 4
+# =============================================================
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large",
+    431: "Request Header Fields Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+RESPONSE_CACHE = LRUCache(maxsize=4096, ttl=6 * 3600)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, close: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.close = close
+
+
+# -----------------------------
+# Scoring (runs in the loop or in pool workers)
+# -----------------------------
+
+def encode_cases(cases: List[Dict], legacy: bool = False, version: Optional[str] = None) -> List[bytes]:
+    """Score complete cases in one vectorized call; per case, the encoded payload without
+    "problem"/"decision" (cacheable across inputs with the same key; see with_case()).
+
+    ``version`` is the catalog version the caller keyed its cache on; a pool
+    worker still on an older catalog reloads before scoring.
+    """
+    reload_if_changed()
+    if version is not None and version != current().version:
+        reload_if_changed(force=True)
+    results = case_results([(c["problem"], c["decision"]) for c in cases], legacy, current())
+    out = []
+    for c, r in zip(cases, results):
+        payload = results_payload(c["problem"], c["decision"], r)
+        del payload["problem"], payload["decision"]
+        out.append(json.dumps(payload, ensure_ascii=False).encode())
+    return out
+
+
+def with_case(case: Dict, scores: bytes) -> bytes:
+    """The full results payload: this request's own problem/decision, then the cached scores."""
+    echo = (json.dumps(case["problem"], ensure_ascii=False), json.dumps(case["decision"], ensure_ascii=False))
+    return b'{"problem": %s, "decision": %s, ' % (echo[0].encode(), echo[1].encode()) + scores[1:]
+
+
+def tagged(index: int, case_id, body: bytes) -> bytes:
+    """Prefix an encoded payload object with its batch "index" and "id" (no re-encoding)."""
+    return b'{"index": %d, "id": %s, ' % (index, json.dumps(case_id).encode()) + body[1:] + b"\n"
+
+
+def error_line(index: int, case_id, message: str) -> bytes:
+    return json.dumps({"index": index, "id": case_id, "error": message}, ensure_ascii=False).encode() + b"\n"
+
+
+def parse_cases(body: bytes) -> List[Dict]:
+    """Batch body: a JSON array of cases or NDJSON, one case object per line."""
+    text = body.decode("utf-8")
+    if text.lstrip().startswith("["):
+        rows = json.loads(text)
+    else:
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if not isinstance(rows, list):
+        raise ValueError("expected a JSON array or NDJSON")
+    return [case_from_row(r, n) for n, r in enumerate(rows, start=1)]
+
+
+# -----------------------------
+# HTTP plumbing
+# -----------------------------
+
+def response_head(status: int, headers: Dict[str, str], keep_alive: bool, timeout: float) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines += [f"{k}: {v}" for k, v in headers.items()]
+    lines.append(f"Keep-Alive: timeout={int(timeout)}" if keep_alive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def parse_head(head: bytes) -> Tuple[str, str, str, Dict[str, str]]:
+    request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+    try:
+        method, target, version = request_line.split(" ")
+    except ValueError:
+        raise HTTPError(400, "malformed request line", close=True)
+    headers = {}
+    for line in header_lines:
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise HTTPError(400, "malformed header", close=True)
+        headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+class ScoringService:
+    """asyncio HTTP front end for the engine; see the module header for routes and limits."""
+
+    def __init__(
+        self,
+        workers: int = 0,
+        chunksize: int = 64,
+        max_inflight: int = 256,
+        max_body: int = 8 << 20,
+        max_batch: int = 10_000,
+        keepalive_timeout: float = 15.0,
+        cache: LRUCache = RESPONSE_CACHE,
+    ):
+        self.workers = workers
+        self.chunksize = chunksize
+        self.max_inflight = max_inflight
+        self.max_body = max_body
+        self.max_batch = max_batch
+        self.keepalive_timeout = keepalive_timeout
+        self.cache = cache
+        self._pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+        self._started = time.monotonic()
+        self.inflight = 0
+        self.connections = 0
+        self.counts: Counter = Counter()
+        self.routes: Counter = Counter()
+        self.statuses: Counter = Counter()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        """Listen on host:port (``port=0`` picks a free port)."""
+        return await asyncio.start_server(self.handle, host, port, limit=64 * 1024)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    # -- connection loop --
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self.counts["connections"] += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    return  # idle keep-alive connection, or client went away
+                except asyncio.LimitOverrunError:
+                    await self._send_error(writer, HTTPError(431, "request head too large", close=True), False)
+                    return
+                keep_alive = await self._request(head, reader, writer)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _request(self, head: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Serve one request; returns whether the connection stays open."""
+        keep_alive = False
+        try:
+            method, target, version, headers = parse_head(head)
+            conn = headers.get("connection", "").lower()
+            keep_alive = conn == "keep-alive" if version == "HTTP/1.0" else conn != "close"
+            body = await self._read_body(headers, reader)
+            url = urlsplit(target)
+            self.routes[url.path] += 1
+            if self.inflight >= self.max_inflight:
+                self.counts["rejected"] += 1
+                raise HTTPError(503, "too many requests in flight, retry later")
+            self.inflight += 1
+            try:
+                return await self._route(method, url.path, parse_qs(url.query), body, writer, keep_alive)
+            finally:
+                self.inflight -= 1
+        except HTTPError as exc:
+            keep_alive = keep_alive and not exc.close
+            await self._send_error(writer, exc, keep_alive)
+            return keep_alive
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as exc:
+            await self._send_error(writer, HTTPError(500, f"{type(exc).__name__}: {exc}", close=True), False)
+            return False
+
+    async def _read_body(self, headers: Dict[str, str], reader: asyncio.StreamReader) -> bytes:
+        if "transfer-encoding" in headers:
+            raise HTTPError(411, "send a Content-Length body (chunked requests are not supported)", close=True)
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "bad Content-Length", close=True)
+        if length > self.max_body:
+            raise HTTPError(413, f"body larger than {self.max_body} bytes", close=True)
+        try:
+            return await asyncio.wait_for(reader.readexactly(length), self.keepalive_timeout) if length else b""
+        except asyncio.TimeoutError:
+            raise HTTPError(408, "body not received in time", close=True)
+
+    async def _route(self, method: str, path: str, query: Dict, body: bytes, writer: asyncio.StreamWriter, keep_alive: bool) -> bool:
+        legacy = query.get("legacy", ["0"])[-1].lower() in ("1", "true", "yes")
+        reload_if_changed()
+        if path in ("/score", "/batch"):
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            if path == "/score":
+                payload = await self.score(body, legacy)
+                await self._send(writer, 200, payload, keep_alive)
+            else:
+                await self.batch(body, legacy, writer, keep_alive)
+            return keep_alive
+        if path in ("/health", "/metrics"):
+            if method != "GET":
+                raise HTTPError(405, "use GET")
+            doc = self.health() if path == "/health" else self.metrics()
+            await self._send(writer, 200, json.dumps(doc).encode(), keep_alive)
+            return keep_alive
+        raise HTTPError(404, f"no route {path}")
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, body: bytes, keep_alive: bool) -> None:
+        self.statuses[status] += 1
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+        writer.write(response_head(status, headers, keep_alive, self.keepalive_timeout) + body)
+        await writer.drain()
+
+    async def _send_error(self, writer: asyncio.StreamWriter, exc: HTTPError, keep_alive: bool) -> None:
+        body = json.dumps({"error": str(exc)}).encode()
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+        if exc.status == 503:
+            headers["Retry-After"] = "1"
+        self.statuses[exc.status] += 1
+        writer.write(response_head(exc.status, headers, keep_alive, self.keepalive_timeout) + body)
+        await writer.drain()
+
+    # -- endpoints --
+
+    async def _encode(self, cases: List[Dict], legacy: bool) -> List[bytes]:
+        if self._pool is None:
+            return encode_cases(cases, legacy)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, encode_cases, cases, legacy, current().version)
+
+    async def score(self, body: bytes, legacy: bool) -> bytes:
+        try:
+            req = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body must be JSON")
+        if not isinstance(req, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        case = case_from_row(req, 1)
+        if not is_complete(case):
+            raise HTTPError(400, case.get("error", INCOMPLETE))
+        key = cache_key(case["problem"], case["decision"], legacy)
+        scores = self.cache.get(key)
+        if scores is not None:
+            self.counts["cases_cached"] += 1
+        else:
+            scores = (await self._encode([case], legacy))[0]
+            self.counts["cases_scored"] += 1
+            self.cache.set(key, scores)
+        return with_case(case, scores)
+
+    async def batch(self, body: bytes, legacy: bool, writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        try:
+            cases = parse_cases(body)
+        except ValueError as exc:  # includes JSON and UTF-8 decode errors
+            raise HTTPError(400, f"bad batch body: {exc}")
+        if len(cases) > self.max_batch:
+            raise HTTPError(413, f"more than {self.max_batch} cases")
+
+        headers = {"Content-Type": "application/x-ndjson", "Transfer-Encoding": "chunked"}
+        self.statuses[200] += 1
+        writer.write(response_head(200, headers, keep_alive, self.keepalive_timeout))
+        try:
+            async for lines in self._batch_lines(cases, legacy):
+                data = b"".join(lines)
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as exc:
+            # the 200 is already out: report the failure as a final line
+            data = json.dumps({"error": f"{type(exc).__name__}: {exc}"}).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _batch_lines(self, cases: List[Dict], legacy: bool) -> AsyncIterator[List[bytes]]:
+        """Encoded NDJSON lines in completion order: errors and cache hits first, then scored chunks."""
+        todo: List[Tuple[int, Dict, str]] = []
+        ready: List[bytes] = []
+        for i, case in enumerate(cases):
+            if not is_complete(case):
+                ready.append(error_line(i, case["id"], case.get("error", INCOMPLETE)))
+                continue
+            key = cache_key(case["problem"], case["decision"], legacy)
+            cached = self.cache.get(key)
+            if cached is None:
+                todo.append((i, case, key))
+            else:
+                self.counts["cases_cached"] += 1
+                ready.append(tagged(i, case["id"], with_case(case, cached)))
+        if ready:
+            yield ready
+
+        def finish(chunk: List[Tuple[int, Dict, str]], payloads: List[bytes]) -> List[bytes]:
+            self.counts["cases_scored"] += len(chunk)
+            lines = []
+            for (i, case, key), scores in zip(chunk, payloads):
+                self.cache.set(key, scores)
+                lines.append(tagged(i, case["id"], with_case(case, scores)))
+            return lines
+
+        if self._pool is None:
+            for chunk in chunked(todo, self.chunksize):
+                yield finish(chunk, encode_cases([c for _, c, _ in chunk], legacy))
+                await asyncio.sleep(0)  # let other connections in between chunks
+            return
+
+        loop = asyncio.get_running_loop()
+        window = 2 * self.workers
+        pending: Dict[asyncio.Future, List] = {}
+        chunks = chunked(todo, self.chunksize)
+        try:
+            while True:
+                for chunk in chunks:
+                    fut = loop.run_in_executor(self._pool, encode_cases, [c for _, c, _ in chunk], legacy, current().version)
+                    pending[fut] = chunk
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    yield finish(pending.pop(fut), fut.result())
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    def health(self) -> Dict:
+        return {"status": "ok", "catalog_version": current().version, "uptime_s": round(time.monotonic() - self._started, 3)}
+
+    def metrics(self) -> Dict:
+        return {
+            "uptime_s": round(time.monotonic() - self._started, 3),
+            "catalog_version": current().version,
+            "connections": {"open": self.connections, "total": self.counts["connections"]},
+            "requests": {
+                "in_flight": self.inflight,
+                "max_inflight": self.max_inflight,
+                "rejected": self.counts["rejected"],
+                "by_route": dict(self.routes),
+            },
+            "responses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "cases": {"scored": self.counts["cases_scored"], "cached": self.counts["cases_cached"]},
+            "cache": self.cache.stats(),
+            "workers": self.workers,
+        }
+
+
+# -----------------------------
+# Stand-in client
+# -----------------------------
+
+class ServiceClient:
+    """Minimal keep-alive HTTP/1.1 client for the service (tests, load checks, other tools).
+
+        async with ServiceClient("127.0.0.1", 8080) as client:
+            result = await client.score(problem, decision)
+            async for line in client.batch(cases):
+                ...
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def __aenter__(self) -> "ServiceClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def _send(self, method: str, path: str, body: bytes, content_type: str) -> Dict[str, str]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n"
+        self._writer.write(head.encode("latin-1") + body)
+        await self._writer.drain()
+        status_line, _, rest = (await self._reader.readuntil(b"\r\n\r\n")).decode("latin-1").partition("\r\n")
+        headers = {"status": status_line.split(" ")[1]}
+        for line in rest.rstrip("\r\n").split("\r\n"):
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return headers
+
+    async def _done(self, headers: Dict[str, str]) -> None:
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        while True:
+            size = int(await self._reader.readuntil(b"\r\n"), 16)
+            data = await self._reader.readexactly(size + 2)
+            if not size:
+                return
+            yield data[:-2]
+
+    async def request(self, method: str, path: str, payload=None):
+        """(status, parsed JSON body); a streamed (NDJSON) body comes back as a list of lines."""
+        body = b"" if payload is None else json.dumps(payload).encode()
+        headers = await self._send(method, path, body, "application/json")
+        if headers.get("transfer-encoding") == "chunked":
+            data = b"".join([chunk async for chunk in self._chunks()])
+            await self._done(headers)
+            return int(headers["status"]), [json.loads(line) for line in data.splitlines()]
+        data = await self._reader.readexactly(int(headers.get("content-length", 0)))
+        await self._done(headers)
+        return int(headers["status"]), json.loads(data or b"{}")
+
+    async def score(self, problem: str, decision: str, legacy: bool = False) -> Dict:
+        status, doc = await self.request("POST", "/score?legacy=1" if legacy else "/score", {"problem": problem, "decision": decision})
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}: {doc.get('error')}")
+        return doc
+
+    async def batch(self, cases: List[Dict], legacy: bool = False) -> AsyncIterator[Dict]:
+        """POST cases as NDJSON and yield each result line as it arrives."""
+        body = b"".join(json.dumps(c).encode() + b"\n" for c in cases)
+        headers = await self._send("POST", "/batch?legacy=1" if legacy else "/batch", body, "application/x-ndjson")
+        if headers.get("transfer-encoding") != "chunked":
+            doc = json.loads(await self._reader.readexactly(int(headers.get("content-length", 0))) or b"{}")
+            await self._done(headers)
+            raise RuntimeError(f"HTTP {headers['status']}: {doc.get('error')}")
+        buf = b""
+        async for chunk in self._chunks():
+            buf += chunk
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                yield json.loads(line)
+        await self._done(headers)
+
+
+async def load_test(host: str, port: int, requests: int = 2000, connections: int = 8, case: Optional[Dict] = None) -> Dict:
+    """Fire ``requests`` /score calls over ``connections`` keep-alive connections; returns req/s."""
+    case = case or {"problem": "Nokia lost smartphone market share; pricing pressure and supplier capacity.", "decision": "Pivot via acquisition."}
+    per_conn = [requests // connections + (i < requests % connections) for i in range(connections)]
+
+    async def worker(n: int) -> None:
+        async with ServiceClient(host, port) as client:
+            for _ in range(n):
+                await client.score(case["problem"], case["decision"])
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in per_conn))
+    elapsed = time.perf_counter() - t0
+    return {"requests": requests, "connections": connections, "seconds": elapsed, "rps": requests / elapsed}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="HTTP scoring service for the FMEA engine.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--workers", type=int, default=0, help="process pool size for scoring (0 = score in the event loop)")
+    ap.add_argument("--chunksize", type=int, default=64, help="batch cases per scoring task")
+    ap.add_argument("--max-inflight", type=int, default=256, help="concurrent requests before answering 503")
+    ap.add_argument("--max-body", type=int, default=8 << 20, help="largest request body (bytes)")
+    ap.add_argument("--max-batch", type=int, default=10_000, help="most cases per /batch request")
+    ap.add_argument("--keepalive-timeout", type=float, default=15.0, help="idle seconds before closing a connection")
+    ap.add_argument("--load-test", type=int, metavar="N", help="instead of serving forever, start and send N /score requests")
+    args = ap.parse_args(argv)
+
+    service = ScoringService(
+        workers=args.workers,
+        chunksize=args.chunksize,
+        max_inflight=args.max_inflight,
+        max_body=args.max_body,
+        max_batch=args.max_batch,
+        keepalive_timeout=args.keepalive_timeout,
+    )
+
+    async def _main() -> None:
+        server = await service.start(args.host, args.port)
+        host, port = server.sockets[0].getsockname()[:2]
+        if args.load_test:
+            async with server:
+                print(json.dumps(await load_test(host, port, args.load_test)))
+            return
+        print(f"Scoring service on http://{host}:{port}/ (workers: {args.workers})", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# =============================================================
+# Agentic AI CEO — import-time (cold start) report
+# -------------------------------------------------------------
+# Runs `python -X importtime -c "import ..."` in fresh interpreters
+# for the modules app.py imports at load (or any -m list) and
+# reports the total, the slowest top-level imports and whether the
+# heavy libraries got pulled in. With --budget-ms the exit code is
+# 1 when the median total is over budget, for CI / deploy checks.
+#
+#   python startup.py
+#   python startup.py --budget-ms 400
+#   python startup.py -m service -m batch --json
+# =============================================================
+
+HEAVY = ("pandas", "altair", "pyarrow", "numpy")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def app_imports(path: str = os.path.join(HERE, "app.py")) -> List[str]:
+    """Top-level modules imported at module level by a script (in order, no duplicates)."""
+    with open(path, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read(), path)
+    names: List[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            found = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            found = [node.module]
+        else:
+            continue
+        names += [n.split(".")[0] for n in found if n.split(".")[0] not in names]
+    return names
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of -X importtime output: name, depth (0 = imported directly), self/cumulative microseconds."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        stripped = name.lstrip()
+        rows.append({
+            "name": stripped.rstrip(),
+            "depth": (len(name) - len(stripped) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def profile_once(modules: List[str]) -> List[Dict]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=HERE, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return parse_importtime(proc.stderr)
+
+
+def import_report(modules: List[str], runs: int = 3) -> Dict:
+    """Profile ``runs`` cold imports; the run with the median total is reported in detail."""
+    profiles = []
+    for _ in range(runs):
+        rows = profile_once(modules)
+        profiles.append((sum(r["cumulative_us"] for r in rows if r["depth"] == 0), rows))
+    profiles.sort(key=lambda p: p[0])
+    total_us, rows = profiles[len(profiles) // 2]
+    loaded = {r["name"] for r in rows}
+    top = sorted((r for r in rows if r["depth"] == 0), key=lambda r: r["cumulative_us"], reverse=True)
+    return {
+        "modules": modules,
+        "runs": runs,
+        "total_ms": total_us / 1e3,
+        "totals_ms": [t / 1e3 for t, _ in profiles],
+        "median_ms": statistics.median(t / 1e3 for t, _ in profiles),
+        "heavy_loaded": {name: name in loaded for name in HEAVY},
+        "top": [{"name": r["name"], "cumulative_ms": r["cumulative_us"] / 1e3} for r in top],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Report cold-start import time for the app (or given modules).")
+    ap.add_argument("-m", "--module", action="append", help="module to import (repeatable; default: app.py's imports)")
+    ap.add_argument("--runs", type=int, default=3, help="fresh interpreters to profile")
+    ap.add_argument("--top", type=int, default=12, help="slowest top-level imports to list")
+    ap.add_argument("--budget-ms", type=float, help="fail (exit 1) when the median total exceeds this")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args(argv)
+
+    report = import_report(args.module or app_imports(), args.runs)
+    over = args.budget_ms is not None and report["median_ms"] > args.budget_ms
+    if args.json:
+        print(json.dumps({**report, "budget_ms": args.budget_ms, "over_budget": over}, indent=2))
+    else:
+        for row in report["top"][:args.top]:
+            print(f"{row['name']:<30} {row['cumulative_ms']:>9.1f} ms")
+        heavy = ", ".join(f"{k}={'yes' if v else 'no'}" for k, v in report["heavy_loaded"].items())
+        print(f"total {report['median_ms']:.1f} ms (median of {report['runs']}); heavy loaded: {heavy}")
+        if args.budget_ms is not None:
+            print(f"budget {args.budget_ms:.0f} ms: {'OVER' if over else 'ok'}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
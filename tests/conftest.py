@@ -0,0 +1,31 @@
+import os
+import random
+import sys
+
+import pytest
+
+# no run archive or rule index files in the working directory during tests
+os.environ["RUN_ARCHIVE"] = ""
+os.environ["RULE_INDEX"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import current  # noqa: E402
+
+# words that stress matching: substrings of keywords ("said" contains "ai"),
+# separators inside phrases ("lead-time"), multi-word triggers, non-ASCII
+EXTRA_WORDS = "the plan a of and said maintain lead time lead-time supply chain data breach go-to-market Σ é".split() + ["", "\n", "-", ",", "\n\n"]
+
+
+@pytest.fixture
+def vocab():
+    rules = current()
+    return [t for spec in rules.themes.values() for t in spec["triggers"]] + list(rules.risky_keywords) + EXTRA_WORDS
+
+
+@pytest.fixture
+def random_text(vocab):
+    """random_text(rng, n_words) -> text drawn from the catalog's keywords and tricky fillers."""
+    def make(rng: random.Random, n_words: int) -> str:
+        return " ".join(rng.choice(vocab) for _ in range(n_words))
+    return make
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import json
+from engine import CASES, analyze_case
+print(json.dumps([analyze_case(p, "Pivot to AI with layoffs and an acquisition") for p in CASES.values()], ensure_ascii=False))
+"""
+
+
+def run_with_seed(seed: str) -> bytes:
+    env = {**os.environ, "PYTHONHASHSEED": seed, "RUN_ARCHIVE": "", "RULE_INDEX": ""}
+    return subprocess.run([sys.executable, "-c", SCRIPT], cwd=ROOT, env=env, capture_output=True, check=True).stdout
+
+
+def test_output_is_identical_across_hash_seeds():
+    outputs = {run_with_seed(seed) for seed in ("0", "1", "12345")}
+    assert len(outputs) == 1
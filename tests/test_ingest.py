@@ -0,0 +1,39 @@
+import io
+import random
+
+import pytest
+
+from engine import case_result, case_signals
+from ingest import document_result, iter_text_chunks, stream_signals
+
+
+def random_chunks(rng, text):
+    """text split at random positions (inside tokens, separators and multi-word phrases)."""
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 30))))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("legacy", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_chunk_boundaries_do_not_change_signals(seed, legacy, random_text):
+    rng = random.Random(seed)
+    for _ in range(30):
+        problem, decision = random_text(rng, rng.randint(0, 150)), random_text(rng, rng.randint(1, 15))
+        chunks = random_chunks(rng, problem)
+        assert "".join(chunks) == problem
+        assert stream_signals(chunks, decision, legacy) == case_signals(problem, decision, legacy)
+
+
+def test_one_char_chunks():
+    problem = "Lead time and supply chain risk; the AI data breach said lead-time."
+    assert stream_signals(list(problem), "pivot") == case_signals(problem, "pivot")
+
+
+def test_document_result_matches_case_result(random_text):
+    rng = random.Random(7)
+    problem, decision = random_text(rng, 2000), "expand and automate"
+    streamed = document_result(iter_text_chunks(io.StringIO(problem), size=97), decision, "[document]")
+    whole = case_result(problem, decision)
+    assert streamed["theme_scores"] == whole["theme_scores"]
+    assert streamed["fmea"] == whole["fmea"]
+    assert streamed["roadmap"].records() == whole["roadmap"].records()
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from engine import case_result
+from live import LiveCase
+
+
+def assert_same(live, full):
+    assert live["theme_scores"] == full["theme_scores"]
+    assert live["fmea"] == full["fmea"]
+    assert live["actions"] == full["actions"]
+    assert live["roadmap"].records() == full["roadmap"].records()
+
+
+@pytest.mark.parametrize("legacy", [False, True])
+def test_random_edits_match_full_rescore(legacy, random_text):
+    rng = random.Random(1)
+
+    def para():
+        return random_text(rng, rng.randint(0, 30))
+
+    live = LiveCase(legacy)
+    problem, decision = [para() for _ in range(8)], [para() for _ in range(3)]
+    for _ in range(150):
+        paras = problem if rng.random() < 0.6 else decision
+        i = rng.randrange(len(paras))
+        op = rng.random()
+        if op < 0.5:
+            paras[i] = para()
+        elif op < 0.7:
+            paras.insert(i, para())
+        elif op < 0.85 and len(paras) > 1:
+            paras.pop(i)
+        else:  # may merge or split paragraphs
+            paras[i] += rng.choice(["", "\n", " ", "\n\n"]) + para()
+        p, d = "\n\n".join(problem), "\n\n".join(decision)
+        assert_same(live.update(p, d), case_result(p, d, legacy))
+
+
+def test_one_paragraph_edit_rescans_little(random_text):
+    rng = random.Random(2)
+    paras = [random_text(rng, 20) for _ in range(200)]
+    live = LiveCase()
+    live.update("\n\n".join(paras), "cut costs")
+    paras[100] = "data breach and layoff"
+    result = live.update("\n\n".join(paras), "cut costs")
+    assert live.rescanned <= 2
+    assert_same(result, case_result("\n\n".join(paras), "cut costs"))
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from catalog import current
+from engine import case_signals, clamp
+from matcher import tokenize
+
+
+def old_tokenize(text):
+    t = text.lower()
+    for ch in ",.;:!?()[]{}|\n\t\r-/_":
+        t = t.replace(ch, " ")
+    return [w for w in t.split() if w]
+
+
+def substring_signals(problem, decision):
+    """The original detect_themes() + base_scores() (substring matching), as reference."""
+    rules = current()
+    text = f"{problem} {decision}".lower()
+    length_bonus = min(len(old_tokenize(text)) / 200.0, 3.0)
+    scores = {theme: sum(text.count(t) for t in spec["triggers"] if t in text) + length_bonus for theme, spec in rules.themes.items()}
+    if sum(scores.values()) == 0:
+        scores = {k: 0.5 for k in scores}
+    sev, occ, det = 6, 5, 5
+    for kw, (ds, do, dd) in rules.risky_keywords.items():
+        if kw in text:
+            sev += ds; occ += do; det += dd
+    length_factor = min(len(text) // 200, 3)
+    return scores, (clamp(sev + length_factor), clamp(occ + length_factor), clamp(det))
+
+
+def token_signals(problem, decision):
+    """Whole-token matching spelled out: a phrase counts where its tokens appear consecutively."""
+    rules = current()
+    text = f"{problem} {decision}".lower()
+    tokens = tokenize(text)
+
+    def count(phrase):
+        words = tokenize(phrase)
+        return sum(tokens[i:i + len(words)] == words for i in range(len(tokens) - len(words) + 1))
+
+    length_bonus = min(len(tokens) / 200.0, 3.0)
+    scores = {theme: sum(count(t) for t in spec["triggers"]) + length_bonus for theme, spec in rules.themes.items()}
+    if sum(scores.values()) == 0:
+        scores = {k: 0.5 for k in scores}
+    sev, occ, det = 6, 5, 5
+    for kw, (ds, do, dd) in rules.risky_keywords.items():
+        if count(kw):
+            sev += ds; occ += do; det += dd
+    length_factor = min(len(text) // 200, 3)
+    return scores, (clamp(sev + length_factor), clamp(occ + length_factor), clamp(det))
+
+
+def test_tokenize_matches_original():
+    text = "AI-driven (cost)/price: lead_time;\tlayoffs!\r\nSaid|x [y] {z} ok? go-to-market."
+    assert tokenize(text) == old_tokenize(text)
+
+
+def test_said_is_not_ai():
+    # same token count, so the same length bonus
+    no_ai = case_signals("He spoke we keep the plan", "wait")[0]["AI & Ethics"]
+    assert case_signals("He said we maintain the plan", "wait")[0]["AI & Ethics"] == no_ai
+    assert case_signals("He said we maintain the plan", "wait", legacy=True)[0]["AI & Ethics"] > no_ai
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_legacy_matches_substring_scoring(seed, random_text):
+    rng = random.Random(seed)
+    for _ in range(40):
+        problem, decision = random_text(rng, rng.randint(0, 120)), random_text(rng, rng.randint(0, 20))
+        assert case_signals(problem, decision, legacy=True) == substring_signals(problem, decision)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_token_matching_matches_reference(seed, random_text):
+    rng = random.Random(seed)
+    for _ in range(40):
+        problem, decision = random_text(rng, rng.randint(0, 120)), random_text(rng, rng.randint(0, 20))
+        assert case_signals(problem, decision) == token_signals(problem, decision)
+
+
+def test_present_risks_in_catalog_order():
+    matcher = current().matcher
+    counts = matcher.count_phrases(tokenize("regulation then layoff then merger and ai"))
+    found = matcher.present_risks(counts)
+    order = list(current().risky_keywords)
+    assert found == sorted(found, key=order.index)
+    assert set(found) == {"regulation", "layoff", "merger", "ai"}
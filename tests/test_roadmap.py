@@ -0,0 +1,38 @@
+import random
+
+import pandas as pd
+
+from engine import case_result
+from roadmap import ROADMAP_COLUMNS, RoadmapAggregator
+
+
+def groupby_roadmap(actions):
+    """The original pandas roadmap (groupby + per-group lambdas), as reference."""
+    return (
+        pd.DataFrame(actions)
+        .groupby(["Action", "Owner", "Theme", "KPI", "StartBy"], as_index=False)
+        .agg({"RPN": "sum", "Leader": lambda s: ", ".join(sorted(set(s))), "Why": lambda s: "; ".join(sorted(set(s)))})
+        .rename(columns={"RPN": "Weight", "Leader": "SupportedBy", "Why": "Rationale"})
+        .sort_values(["StartBy", "Weight"], ascending=[True, False])
+    )
+
+
+def test_aggregator_matches_groupby(random_text):
+    rng = random.Random(3)
+    actions = []
+    for _ in range(30):
+        actions += case_result(random_text(rng, 60), random_text(rng, 8))["actions"]
+    expected = groupby_roadmap(actions)
+    frame = RoadmapAggregator(actions).to_frame()
+    assert list(frame.columns) == ROADMAP_COLUMNS
+    assert frame.to_dict("records") == expected[ROADMAP_COLUMNS].to_dict("records")
+    assert list(frame.index) == list(expected.index)
+
+
+def test_merge_equals_single_pass(random_text):
+    rng = random.Random(4)
+    chunks = [[a for _ in range(5) for a in case_result(random_text(rng, 40), "go")["actions"]] for _ in range(4)]
+    merged = RoadmapAggregator()
+    for chunk in chunks:
+        merged += RoadmapAggregator(chunk)
+    assert merged.records() == RoadmapAggregator([a for chunk in chunks for a in chunk]).records()
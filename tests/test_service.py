@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from cache import LRUCache
+from engine import analyze_case
+from service import ScoringService, ServiceClient
+
+CASES = [
+    {"id": "a", "problem": "Nokia lost smartphone market share; pricing pressure.", "decision": "Pivot via acquisition."},
+    {"id": "b", "problem": 5, "decision": "x"},
+    {"id": "c", "problem": "Cloud outage hit customer data and compliance.", "decision": "Cut the vendor budget."},
+    [1],
+    {"id": "e", "problem": "NOKIA LOST SMARTPHONE MARKET SHARE; PRICING PRESSURE.", "decision": "pivot via acquisition."},
+]
+
+
+def serve(scenario, **options):
+    """Run ``scenario(service, client)`` against a service listening on a free port."""
+
+    async def main():
+        service = ScoringService(cache=LRUCache(maxsize=64), **options)
+        server = await service.start("127.0.0.1", 0)
+        host, port = server.sockets[0].getsockname()[:2]
+        try:
+            async with server:
+                async with ServiceClient(host, port) as client:
+                    return await scenario(service, client)
+        finally:
+            service.close()
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_score_and_batch_match_the_engine(workers):
+    async def scenario(service, client):
+        lines = [line async for line in client.batch(CASES)]
+        assert sorted(line["index"] for line in lines) == list(range(len(CASES)))
+        by_index = {line["index"]: line for line in lines}
+        for i, case in enumerate(CASES):
+            line = by_index[i]
+            if i in (1, 3):
+                assert "error" in line
+                continue
+            assert line["id"] == case["id"]
+            assert {k: v for k, v in line.items() if k not in ("index", "id")} == analyze_case(case["problem"], case["decision"])
+        # fresh cases are scored (in the pool when workers > 0), repeats come from the cache
+        problem, decision = "Supplier capacity is short and quality slips.", "Dual-source now."
+        assert await client.score(problem, decision) == analyze_case(problem, decision)
+        assert await client.score(CASES[4]["problem"], CASES[4]["decision"]) == analyze_case(CASES[4]["problem"], CASES[4]["decision"])
+        metrics = service.metrics()
+        assert metrics["cases"] == {"scored": 4, "cached": 1}
+        assert metrics["connections"]["total"] == 1  # every request reused one keep-alive connection
+
+    serve(scenario, workers=workers, chunksize=2)
+
+
+def test_error_statuses_keep_the_connection():
+    async def scenario(service, client):
+        status, doc = await client.request("POST", "/score", {"problem": 5, "decision": "x"})
+        assert status == 400 and doc["error"]
+        status, _ = await client.request("POST", "/score", [1, 2])
+        assert status == 400
+        status, _ = await client.request("GET", "/nowhere")
+        assert status == 404
+        status, _ = await client.request("POST", "/batch", CASES[:3])
+        assert status == 413
+        status, doc = await client.request("GET", "/health")
+        assert status == 200 and doc["status"] == "ok"
+        metrics = service.metrics()
+        assert metrics["connections"]["total"] == 1
+        assert metrics["responses"] == {"200": 1, "400": 2, "404": 1, "413": 1}
+
+    serve(scenario, max_batch=2)
+
+
+def test_oversized_body_is_rejected():
+    async def scenario(service, client):
+        status, doc = await client.request("POST", "/score", {"problem": "x" * 2048, "decision": "y"})
+        assert status == 413 and "larger than" in doc["error"]
+
+    serve(scenario, max_body=1024)